@@ -0,0 +1,364 @@
+"""
+Benchmarks of pymapping on structured meshes of increasing size
+
+Each case (dimension, size, method, intersection type) runs in a fresh process,
+so that the peak memory of the case is measured. Stage timings are taken from
+:py:attr:`pymapping.Mapper.stats`. Results are written as JSON, and may be
+compared with the results of another commit::
+
+    python benchmarks/benchmark.py --output new.json --compare old.json
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+
+import meshio
+import numpy as np
+
+methods = {
+    "P1P1": ["PointLocator", "Triangulation"],
+    "P1P0": ["PointLocator", "Triangulation"],
+    "P0P0": ["Triangulation"],
+    "P0P1": ["Triangulation"],
+}
+
+# Number of cells along each direction of the source meshes
+sizes = {
+    1: [1000, 10000, 100000, 1000000],
+    2: [25, 50, 100, 200, 400],
+    3: [5, 10, 20, 40],
+}
+sizes_quick = {1: [1000, 10000], 2: [25, 50], 3: [5, 10]}
+
+# Largest sizes of the cases whose preparation is too slow on larger meshes:
+# intersecting P1 dual cells of tetrahedra takes seconds already at n=10.
+# Cases not supported by medcoupling are skipped at all sizes.
+max_sizes = {
+    (1, "P1P0", "PointLocator"): 0,
+    (3, "P1P1", "Triangulation"): 10,
+    (3, "P1P0", "Triangulation"): 10,
+    (3, "P0P1", "Triangulation"): 10,
+}
+
+# Ratio of the number of target cells to source cells along each direction,
+# and shift of the target grid so that both meshes are not conforming
+target_ratio = 0.7
+target_shift = 0.01
+
+
+def structured_mesh(dim, n, shift=0.0):
+    """
+    Structured mesh of the unit segment, square or cube made of lines,
+    triangles or tetrahedra, with ``n`` subdivisions along each direction
+    """
+    x = np.linspace(0, 1, n + 1) + shift
+    grids = np.meshgrid(*([x] * dim), indexing="ij")
+    points = np.column_stack([g.ravel() for g in grids])
+
+    # First point of each hypercube and offsets of its corners
+    corners = np.array(np.meshgrid(*([[0, 1]] * dim), indexing="ij"))
+    corners = corners.reshape(dim, -1).T
+    strides = (n + 1) ** np.arange(dim)[::-1]
+    first = np.array(np.meshgrid(*([np.arange(n)] * dim), indexing="ij"))
+    first = first.reshape(dim, -1).T @ strides
+    cubes = first[:, None] + corners @ strides
+
+    # Split hypercubes into simplices (Kuhn triangulation)
+    if dim == 1:
+        return meshio.Mesh(points, [("line", cubes)])
+    simplices = []
+    for permutation in itertools.permutations(range(dim)):
+        vertex = np.zeros(dim, dtype=int)
+        ids = [0]
+        for axis in permutation:
+            vertex[axis] = 1
+            ids.append(int(vertex @ (2 ** np.arange(dim)[::-1])))
+        simplices.append(cubes[:, ids])
+    celltype = "triangle" if dim == 2 else "tetra"
+    return meshio.Mesh(points, [(celltype, np.concatenate(simplices))])
+
+
+def _field(coords):
+    return np.prod(np.sin(2 * np.pi * coords), axis=1) + coords[:, 0]
+
+
+def run_case(dim, n, method, intersection_type):
+    """
+    Prepare and transfer one field between a source mesh with ``n`` cells
+    along each direction and a shifted, coarser target mesh
+
+    Returns:
+        dict: Sizes, stage timings, number of non-zeros and peak memory of the case
+    """
+    # Imported beforehand so that import times are not measured
+    import scipy.sparse  # noqa: F401
+
+    import pymapping
+    from pymapping.stats import peak_rss
+
+    mesh_source = structured_mesh(dim, n)
+    mesh_target = structured_mesh(dim, max(1, int(target_ratio * n)), target_shift)
+    mesh_source.point_data["f"] = _field(mesh_source.points)
+    centroids = mesh_source.points[mesh_source.cells[0].data].mean(axis=1)
+    mesh_source.cell_data["f"] = [_field(centroids)]
+
+    case = {
+        "dim": dim,
+        "n": n,
+        "method": method,
+        "intersection_type": intersection_type,
+        "source_points": len(mesh_source.points),
+        "source_cells": len(mesh_source.cells[0].data),
+        "target_points": len(mesh_target.points),
+        "target_cells": len(mesh_target.cells[0].data),
+    }
+    mapper = pymapping.Mapper(verbose=False)
+    try:
+        mapper.prepare(mesh_source, mesh_target, method, intersection_type)
+        mapper.transfer("f")
+        mapper.transfer_many(["f"])
+    except Exception as e:
+        case["error"] = "{}: {}".format(type(e).__name__, e)
+        return case
+
+    totals = mapper.stats.totals()
+    case["stages"] = {name: total["wall_time"] for name, total in totals.items()}
+    case["cpu_time"] = sum(
+        total["cpu_time"]
+        for name, total in totals.items()
+        if name in ["cleanup_mesh_meshio", "prepare", "transferField"]
+    )
+    case["nnz"] = mapper._crude_matrix().nnz
+    # Peak of the whole process, run for this case only, including the preparation
+    case["peak_rss"] = peak_rss()
+    return case
+
+
+def _run_case_isolated(args):
+    return run_case(*args)
+
+
+def scaling(results, stage="prepare"):
+    """
+    Empirical exponents of a stage time with respect to the number of source cells,
+    between consecutive sizes of each (dimension, method, intersection type).
+    An exponent much larger than 1 reveals a superlinear behaviour.
+    """
+    curves = {}
+    for case in results:
+        if "error" in case or stage not in case["stages"]:
+            continue
+        key = (case["dim"], case["method"], case["intersection_type"])
+        curves.setdefault(key, []).append((case["source_cells"], case["stages"][stage]))
+
+    exponents = []
+    for (dim, method, intersection_type), curve in sorted(curves.items()):
+        curve.sort()
+        for (n0, t0), (n1, t1) in zip(curve[:-1], curve[1:]):
+            if t0 > 0 and t1 > 0:
+                exponents.append(
+                    {
+                        "dim": dim,
+                        "method": method,
+                        "intersection_type": intersection_type,
+                        "stage": stage,
+                        "source_cells": [n0, n1],
+                        "exponent": np.log(t1 / t0) / np.log(n1 / n0),
+                    }
+                )
+    return exponents
+
+
+def metadata():
+    import medcoupling as mc
+
+    import pymapping
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "pymapping": pymapping.__version__,
+        "medcoupling": mc.MEDCouplingVersionStr(),
+        "numpy": np.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def compare(results, reference, stage="prepare"):
+    """
+    Print the ratio of the stage times of the current results
+    to those of reference results
+    """
+    times = {}
+    for case in reference:
+        if "error" not in case and stage in case["stages"]:
+            times[_case_key(case)] = case["stages"][stage]
+    print(
+        "{:>3} {:>8} {:>5} {:>14} {:>10} {:>10} {:>7}".format(
+            "dim", "n", "meth", "intersection", "old (s)", "new (s)", "ratio"
+        )
+    )
+    for case in results:
+        key = _case_key(case)
+        if "error" in case or key not in times:
+            continue
+        t_old = times[key]
+        t_new = case["stages"][stage]
+        print(
+            "{:>3} {:>8} {:>5} {:>14} {:>10.4f} {:>10.4f} {:>7.2f}".format(
+                *key, t_old, t_new, t_new / t_old if t_old > 0 else np.inf
+            )
+        )
+
+
+def _case_key(case):
+    return (case["dim"], case["n"], case["method"], case["intersection_type"])
+
+
+def plot(results, filename, stage="prepare"):
+    """
+    Plot the stage times against the number of source cells in log-log scale
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    dims = sorted({case["dim"] for case in results})
+    fig, axes = plt.subplots(1, len(dims), figsize=(5 * len(dims), 4), squeeze=False)
+    for ax, dim in zip(axes[0], dims):
+        curves = {}
+        for case in results:
+            if case["dim"] == dim and "error" not in case:
+                label = "{} {}".format(case["method"], case["intersection_type"])
+                curves.setdefault(label, []).append(
+                    (case["source_cells"], case["stages"][stage])
+                )
+        for label, curve in sorted(curves.items()):
+            curve.sort()
+            ax.loglog(*zip(*curve), marker="o", label=label)
+        ax.set_title("{}D".format(dim))
+        ax.set_xlabel("Number of source cells")
+        ax.set_ylabel("{} time (s)".format(stage))
+        ax.legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(filename)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of pymapping")
+    parser.add_argument(
+        "--output", type=str, default="benchmark.json", help="JSON file of results"
+    )
+    parser.add_argument(
+        "--dims", type=int, nargs="+", default=[1, 2, 3], help="mesh dimensions"
+    )
+    parser.add_argument(
+        "--methods",
+        type=str,
+        nargs="+",
+        choices=list(methods),
+        default=list(methods),
+        help="mapping methods",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="cells along each direction of the source meshes (default: per dimension)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", default=False, help="only run small meshes"
+    )
+    parser.add_argument(
+        "--compare", type=str, help="JSON file of reference results to compare with"
+    )
+    parser.add_argument(
+        "--plot", type=str, help="image file of the scaling curves of prepare"
+    )
+    args = parser.parse_args(argv)
+
+    cases = []
+    for dim in args.dims:
+        sizes_dim = args.sizes or (sizes_quick if args.quick else sizes)[dim]
+        for n in sizes_dim:
+            for method in args.methods:
+                for intersection_type in methods[method]:
+                    max_size = max_sizes.get((dim, method, intersection_type))
+                    if max_size is None or n <= max_size:
+                        cases.append((dim, n, method, intersection_type))
+
+    # A new process for each case, so that peak memory is measured per case
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for case in pool.imap(_run_case_isolated, cases):
+            results.append(case)
+            if "error" in case:
+                status = case["error"]
+            else:
+                status = "prepare {:.4f}s, transfer {:.4f}s, {:.0f} MB".format(
+                    case["stages"]["prepare"],
+                    case["stages"]["transferField"],
+                    case["peak_rss"] / 1024**2 if case["peak_rss"] else np.nan,
+                )
+            print(
+                "{}D n={} {} {}: {}".format(
+                    case["dim"],
+                    case["n"],
+                    case["method"],
+                    case["intersection_type"],
+                    status,
+                ),
+                flush=True,
+            )
+
+    output = {
+        "metadata": metadata(),
+        "results": results,
+        "scaling": scaling(results),
+    }
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+
+    for exponent in output["scaling"]:
+        if exponent["exponent"] > 1.3:
+            print(
+                "Superlinear prepare: {}D {} {} between {} and {} cells "
+                "(exponent {:.2f})".format(
+                    exponent["dim"],
+                    exponent["method"],
+                    exponent["intersection_type"],
+                    *exponent["source_cells"],
+                    exponent["exponent"],
+                )
+            )
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+    if args.plot is not None:
+        plot(results, args.plot)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
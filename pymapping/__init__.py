@@ -1,12 +1,31 @@
-from . import cli
 from .__about__ import __author__, __email__, __license__, __status__, __version__
-from .main import (
-    Mapper,
-    MappingResult,
-    cleanup_mesh_meshio,
-    field_mc_from_meshio,
-    mesh_mc_from_meshio,
-)
+
+# Public names and the submodules defining them, imported on first access so that
+# importing pymapping (e.g. by the command line interface) does not load numpy,
+# meshio or medcoupling
+_submodules = {
+    "cli": "cli",
+    "read_manifest": "batch",
+    "run_batch": "batch",
+    "Mapper": "main",
+    "MappingResult": "main",
+    "MappingResults": "main",
+    "MatrixCache": "main",
+    "cleanup_mesh_meshio": "main",
+    "field_mc_from_meshio": "main",
+    "mesh_mc_from_meshio": "main",
+    "prepare_hierarchy": "main",
+    "prepare_many": "main",
+    "FieldWriter": "output",
+    "read_field": "output",
+    "merge_meshes": "partition",
+    "read_partitioned": "partition",
+    "Probe": "probe",
+    "map_time_series": "series",
+    "transfer_time_series": "series",
+    "MapperStats": "stats",
+    "StageRecord": "stats",
+}
 
 __all__ = [
     "__author__",
@@ -18,6 +37,34 @@ __all__ = [
     "Mapper",
     "cleanup_mesh_meshio",
     "MappingResult",
+    "MappingResults",
+    "MatrixCache",
+    "Probe",
+    "FieldWriter",
+    "read_field",
+    "merge_meshes",
+    "read_partitioned",
+    "MapperStats",
+    "StageRecord",
     "mesh_mc_from_meshio",
     "field_mc_from_meshio",
+    "prepare_many",
+    "prepare_hierarchy",
+    "transfer_time_series",
+    "map_time_series",
+    "read_manifest",
+    "run_batch",
 ]
+
+
+def __getattr__(name):
+    if name not in _submodules:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    module = __import__(_submodules[name], globals(), None, ["__name__"], 1)
+    value = module if name == _submodules[name] else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,4 +1,6 @@
+import sys
+
 import pymapping
 
 if __name__ == "__main__":
-    pymapping.cli.main()
+    sys.exit(pymapping.cli.main())
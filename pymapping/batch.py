@@ -0,0 +1,233 @@
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+from .main import Mapper, MatrixCache
+
+job_defaults = {
+    "method": "P1P1",
+    "intersection_type": None,
+    "nature": "IntensiveMaximum",
+    "default_value": np.nan,
+}
+
+
+def read_manifest(filename):
+    """
+    Read the jobs of a batch from a JSON or CSV manifest.
+
+    Each job has the keys ``mesh_source``, ``mesh_target``, ``field_name`` and
+    ``outfile``, and optionally ``method``, ``intersection_type``, ``nature`` and
+    ``default_value``. ``field_name`` may list several fields (a JSON list, or
+    names separated by ``;`` in CSV) written to the same output file. Relative
+    paths are relative to the directory of the manifest.
+
+    Args:
+        filename (str): JSON file holding a list of jobs, or CSV file
+                        with one job per row and the keys as header
+
+    Returns:
+        list: Jobs as ``dict``, completed with default options
+    """
+    if filename.endswith(".csv"):
+        with open(filename, newline="") as f:
+            rows = [
+                {key: value for key, value in row.items() if value not in ["", None]}
+                for row in csv.DictReader(f)
+            ]
+        for row in rows:
+            row["field_name"] = row["field_name"].split(";")
+            if "default_value" in row:
+                row["default_value"] = float(row["default_value"])
+    else:
+        with open(filename) as f:
+            rows = json.load(f)
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    jobs = []
+    for row in rows:
+        job = dict(job_defaults)
+        job.update(row)
+        if isinstance(job["field_name"], str):
+            job["field_name"] = [job["field_name"]]
+        for key in ["mesh_source", "mesh_target", "outfile"]:
+            job[key] = os.path.join(directory, job[key])
+        jobs.append(job)
+    return jobs
+
+
+def group_jobs(jobs):
+    """
+    Group jobs sharing the same meshes, method and intersection type,
+    which are read and prepared once
+
+    Returns:
+        list: Lists of the indices of the jobs of each group
+    """
+    groups = {}
+    for k, job in enumerate(jobs):
+        key = (
+            job["mesh_source"],
+            job["mesh_target"],
+            job["method"],
+            job["intersection_type"],
+        )
+        groups.setdefault(key, []).append(k)
+    return list(groups.values())
+
+
+def run_group(jobs, cache_dir=None):
+    """
+    Read and prepare the meshes of a group of jobs, then transfer
+    and write the fields of each job
+
+    Args:
+        jobs (list): Jobs sharing the same meshes, method and intersection type
+        cache_dir (str): Directory of the cache of interpolation matrices
+
+    Returns:
+        dict: Record of the group, with a record for each job
+    """
+    import meshio
+
+    job = jobs[0]
+    record = {
+        "mesh_source": job["mesh_source"],
+        "mesh_target": job["mesh_target"],
+        "method": job["method"],
+        "intersection_type": job["intersection_type"],
+        "jobs": [],
+    }
+    cache = None if cache_dir is None else MatrixCache(cache_dir)
+    mapper = Mapper(verbose=False, cache=cache)
+    try:
+        with mapper.stats.stage("read"):
+            mesh_source = meshio.read(job["mesh_source"])
+            mesh_target = meshio.read(job["mesh_target"])
+        mapper.prepare(
+            mesh_source, mesh_target, job["method"], job["intersection_type"]
+        )
+    except Exception as e:
+        record["error"] = _error(e)
+        for job in jobs:
+            record["jobs"].append(
+                {"outfile": job["outfile"], "status": "error", "error": record["error"]}
+            )
+        return record
+
+    totals = mapper.stats.totals()
+    for stage in ["read", "prepare"]:
+        record[stage + "_time"] = totals[stage]["wall_time"]
+
+    for job in jobs:
+        record_job = {"outfile": job["outfile"]}
+        wall_time = time.perf_counter()
+        try:
+            res = mapper.transfer_many(
+                job["field_name"], job["nature"], job["default_value"]
+            )
+            write_results(res, job["outfile"])
+            record_job["status"] = "ok"
+        except Exception as e:
+            record_job["status"] = "error"
+            record_job["error"] = _error(e)
+        record_job["wall_time"] = time.perf_counter() - wall_time
+        record["jobs"].append(record_job)
+    return record
+
+
+def write_results(res, outfile):
+    """
+    Write mapped fields to a ``.txt`` or ``.npy`` file (one column per field
+    component), append them to a ``.h5`` file as a new time step (see
+    :py:class:`~.FieldWriter`), or write them to any meshio-compatible mesh file
+
+    Args:
+        res (MappingResults): Mapped fields
+        outfile (str): Output file
+    """
+    if outfile.endswith(".h5") or outfile.endswith(".hdf5"):
+        from .output import FieldWriter
+
+        with FieldWriter(outfile) as writer:
+            writer.write(res)
+    elif ".txt" in outfile or ".npy" in outfile:
+        if len(res) == 1:
+            array = res[next(iter(res))]
+        else:
+            array = res.block
+        if ".txt" in outfile:
+            np.savetxt(outfile, array)
+        else:
+            np.save(outfile, array)
+    else:
+        import meshio
+
+        meshio.write(outfile, res.mesh_meshio(copy=False))
+
+
+def run_batch(jobs, workers=1, cache_dir=None, log=None, verbose=True):
+    """
+    Run a batch of mapping jobs: jobs are grouped by mesh pair and method
+    with :py:func:`group_jobs`, and groups are distributed across a process pool.
+
+    Args:
+        jobs (list): Jobs, e.g. returned by :py:func:`read_manifest`
+        workers (int): Number of processes
+        cache_dir (str): Directory of the cache of interpolation matrices
+        log (str): JSON lines file to which a record is appended for each job
+        verbose (bool): Whether print out progress information
+
+    Returns:
+        list: Records of the groups, see :py:func:`run_group`
+    """
+    groups = group_jobs(jobs)
+    tasks = [[jobs[k] for k in group] for group in groups]
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        futures = [executor.submit(run_group, task, cache_dir) for task in tasks]
+        results = (future.result() for future in as_completed(futures))
+    else:
+        executor = None
+        results = (run_group(task, cache_dir) for task in tasks)
+
+    records = []
+    ndone = 0
+    logfile = None if log is None else open(log, "a")
+    try:
+        for record in results:
+            records.append(record)
+            for record_job in record["jobs"]:
+                ndone += 1
+                if verbose:
+                    print(
+                        "[{}/{}] {}: {}".format(
+                            ndone,
+                            len(jobs),
+                            record_job["outfile"],
+                            record_job.get("error", record_job["status"]),
+                        )
+                    )
+                if logfile is not None:
+                    entry = {
+                        key: value for key, value in record.items() if key != "jobs"
+                    }
+                    entry.update(record_job)
+                    logfile.write(json.dumps(entry) + "\n")
+                    logfile.flush()
+    finally:
+        if logfile is not None:
+            logfile.close()
+        if executor is not None:
+            executor.shutdown()
+    return records
+
+
+def _error(e):
+    return "{}: {}".format(type(e).__name__, e)
@@ -1,34 +1,157 @@
 import sys
 
-import numpy as np
-
 from .__about__ import __copyright__, __version__
-from .main import Mapper
+
+# Heavy libraries (numpy, meshio, medcoupling) are only imported once arguments
+# are parsed, so that --help, --version or argument errors return at once
 
 
 def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) > 0 and argv[0] in _commands:
+        return _commands[argv[0]](argv[1:])
+
     # Parse command line arguments.
     parser = _get_parser()
     args = parser.parse_args(argv)
 
     import meshio
+    import numpy as np
 
-    mapper = Mapper(verbose=args.verbose)
+    from .main import Mapper, MatrixCache
+    from .partition import read_partitioned
+
+    cache = None
+    if args.cache_dir is not None:
+        cache = MatrixCache(args.cache_dir, max_size=int(args.cache_size * 1024**2))
+    mapper = Mapper(verbose=args.verbose, cache=cache, backend=args.backend)
+
+    with mapper.stats.stage("read"):
+        mesh_source = read_partitioned(args.mesh_source, workers=args.workers)
+        mesh_target = read_partitioned(args.mesh_target, workers=args.workers)
+    mapper.prepare(
+        mesh_source,
+        mesh_target,
+        args.method,
+        args.intersection_type,
+        workers=args.workers,
+        source_cells=_cell_selection(args.source_cells),
+        target_cells=_cell_selection(args.target_cells),
+    )
+
+    if args.diagnostics is not None or args.max_unmapped is not None:
+        report = mapper.diagnostics([args.field_name])
+        if args.diagnostics is not None:
+            import json
+
+            with open(args.diagnostics, "w") as f:
+                json.dump(report, f, indent=2)
+        if (
+            args.max_unmapped is not None
+            and report["unmapped_ratio"] > args.max_unmapped
+        ):
+            print(
+                "Mapping rejected: {} of {} target entities ({:.2%}) "
+                "out of the source mesh".format(
+                    report["unmapped"], report["nrows"], report["unmapped_ratio"]
+                ),
+                file=sys.stderr,
+            )
+            return 1
+
+    if args.outfile.endswith(".h5") or args.outfile.endswith(".hdf5"):
+        # Mapped field written block after block, appended to the file
+        mapper.transfer_to(args.outfile, [args.field_name], args.nature)
+        if args.profile is not None:
+            mapper.stats.write_json(args.profile)
+        return
 
-    mesh_source = meshio.read(args.mesh_source)
-    mesh_target = meshio.read(args.mesh_target)
-    mapper.prepare(mesh_source, mesh_target, args.method, args.intersection_type)
     res = mapper.transfer(args.field_name, args.nature)
 
-    if ".txt" in args.outfile:
-        np.savetxt(args.outfile, res.array())
-    elif ".npy" in args.outfile:
-        np.save(args.outfile, res.array())
-    elif ".vtu" in args.outfile:
-        res.export_vtk(args.outfile)
-    else:
-        mesh_target = res.mesh_meshio()
-        meshio.write(args.outfile, mesh_target)
+    with mapper.stats.stage("write", outfile=args.outfile):
+        if ".txt" in args.outfile:
+            np.savetxt(args.outfile, res.array())
+        elif ".npy" in args.outfile:
+            np.save(args.outfile, res.array())
+        elif ".vtu" in args.outfile:
+            res.export_vtk(args.outfile)
+        else:
+            mesh_target = res.mesh_meshio(copy=False)
+            meshio.write(args.outfile, mesh_target)
+
+    if args.profile is not None:
+        mapper.stats.write_json(args.profile)
+
+    return
+
+
+def series(argv=None):
+    # Parse command line arguments.
+    parser = _get_series_parser()
+    args = parser.parse_args(argv)
+
+    import meshio
+
+    from .main import Mapper
+    from .series import map_time_series
+
+    mapper = Mapper(verbose=args.verbose)
+    mesh_target = meshio.read(args.mesh_target)
+    map_time_series(
+        args.source_series,
+        mesh_target,
+        args.outfile,
+        field_names=args.field_names,
+        method=args.method,
+        intersection_type=args.intersection_type,
+        nature=args.nature,
+        default_value=args.default_value,
+        mapper=mapper,
+    )
+
+    if args.profile is not None:
+        mapper.stats.write_json(args.profile)
+
+    return
+
+
+def batch(argv=None):
+    # Parse command line arguments.
+    parser = _get_batch_parser()
+    args = parser.parse_args(argv)
+
+    from .batch import read_manifest, run_batch
+
+    jobs = read_manifest(args.manifest)
+    records = run_batch(
+        jobs,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+        log=args.log,
+        verbose=args.verbose,
+    )
+
+    # Non-zero exit status if any job failed
+    if any(job["status"] != "ok" for record in records for job in record["jobs"]):
+        return 1
+    return
+
+
+def serve(argv=None):
+    # Parse command line arguments.
+    parser = _get_serve_parser()
+    args = parser.parse_args(argv)
+
+    from .service import serve
+
+    serve(
+        path=args.socket,
+        host=args.host,
+        port=args.port,
+        max_mappers=args.max_mappers,
+        workers=args.workers,
+    )
 
     return
 
@@ -42,11 +165,16 @@ def _get_parser():
     )
 
     parser.add_argument(
-        "mesh_source", type=str, help="meshio-compatible source mesh file"
+        "mesh_source",
+        type=str,
+        help="meshio-compatible source mesh file, or partitioned mesh:\n"
+        ".pvtu file or glob pattern of the partitions, e.g. 'out_*.vtu'",
     )
 
     parser.add_argument(
-        "mesh_target", type=str, help="meshio-compatible target mesh file"
+        "mesh_target",
+        type=str,
+        help="meshio-compatible target mesh file, or partitioned mesh",
     )
 
     parser.add_argument(
@@ -58,24 +186,64 @@ def _get_parser():
     parser.add_argument(
         "outfile",
         type=str,
-        help="file to store mapped data: .txt, .npy or meshio-compatible mesh",
+        help="file to store mapped data: .txt, .npy, .h5 (appended to the file) "
+        "or meshio-compatible mesh",
     )
 
+    _add_mapping_arguments(parser)
+
     parser.add_argument(
-        "--method",
+        "--backend",
         type=str,
-        choices=["P1P1", "P1P0", "P0P1", "P0P0"],
-        default="P1P1",
-        help="mapping method",
+        choices=["medcoupling", "numpy"],
+        default="medcoupling",
+        help="engine computing the interpolation matrix",
     )
 
-    parser.add_argument("--intersection_type", type=str, help="intersection algorithm")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes reading partitioned meshes and preparing the mapping",
+    )
 
     parser.add_argument(
-        "--nature",
+        "--cache_dir",
         type=str,
-        default="IntensiveMaximum",
-        help="physical nature of the field",
+        help="directory caching prepared interpolation matrices between runs",
+    )
+
+    parser.add_argument(
+        "--cache_size",
+        type=float,
+        default=1024,
+        help="maximum size of the cache directory in MB",
+    )
+
+    parser.add_argument(
+        "--source_cells",
+        type=str,
+        help="restrict the mapping to the source cells of a cell data tag,\n"
+        "e.g. gmsh:physical=1,2",
+    )
+
+    parser.add_argument(
+        "--target_cells",
+        type=str,
+        help="restrict the mapping to the target cells of a cell data tag",
+    )
+
+    parser.add_argument(
+        "--diagnostics",
+        type=str,
+        help="JSON file to store the coverage and conservation of the mapping",
+    )
+
+    parser.add_argument(
+        "--max_unmapped",
+        type=float,
+        help="maximum ratio of target points or cells out of the source mesh, "
+        "above which the mapping is rejected without writing outfile",
     )
 
     parser.add_argument(
@@ -105,3 +273,169 @@ def _get_parser():
     )
 
     return parser
+
+
+def _get_series_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="pymapping series",
+        description=("Mapping an XDMF time series between meshes"),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    parser.add_argument(
+        "source_series", type=str, help="XDMF time series on the source mesh"
+    )
+
+    parser.add_argument(
+        "mesh_target", type=str, help="meshio-compatible target mesh file"
+    )
+
+    parser.add_argument(
+        "outfile", type=str, help="XDMF file to store the mapped time series"
+    )
+
+    parser.add_argument(
+        "--field_names",
+        type=str,
+        nargs="+",
+        help="fields to transfer (default: all fields compatible with the method)",
+    )
+
+    _add_mapping_arguments(parser)
+
+    parser.add_argument(
+        "--default_value",
+        type=float,
+        default=float("nan"),
+        help="value set where mapping is not possible",
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        default=False,
+        help="increase output verbosity",
+    )
+
+    return parser
+
+
+def _get_batch_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="pymapping batch",
+        description=(
+            "Mapping fields of a batch of jobs, preparing each mesh pair only once"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    parser.add_argument(
+        "manifest",
+        type=str,
+        help="JSON or CSV file listing the jobs: mesh_source, mesh_target, field_name,\n"
+        "outfile, and optionally method, intersection_type, nature, default_value",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes, each of them handling a mesh pair at a time",
+    )
+
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        help="directory caching prepared interpolation matrices between runs",
+    )
+
+    parser.add_argument(
+        "--log",
+        type=str,
+        help="JSON lines file to which the status and timings of each job are appended",
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        default=False,
+        help="increase output verbosity",
+    )
+
+    return parser
+
+
+def _get_serve_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="pymapping serve",
+        description=("Local mapping service keeping prepared mappers in memory"),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--socket", type=str, help="Unix socket on which to listen instead of TCP"
+    )
+
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="TCP host")
+
+    parser.add_argument("--port", type=int, default=8642, help="TCP port")
+
+    parser.add_argument(
+        "--max_mappers",
+        type=int,
+        default=8,
+        help="maximum number of prepared mappers kept in memory",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of processes preparing mesh pairs",
+    )
+
+    return parser
+
+
+def _cell_selection(text):
+    """
+    Selection ``(name, values)`` of cells from ``NAME=VALUE[,VALUE...]``
+    """
+    if text is None:
+        return None
+    name, values = text.rsplit("=", 1)
+    return name, [float(value) for value in values.split(",")]
+
+
+def _add_mapping_arguments(parser):
+    parser.add_argument(
+        "--method",
+        type=str,
+        choices=["P1P1", "P1P0", "P0P1", "P0P0"],
+        default="P1P1",
+        help="mapping method",
+    )
+
+    parser.add_argument("--intersection_type", type=str, help="intersection algorithm")
+
+    parser.add_argument(
+        "--profile",
+        type=str,
+        help="JSON file to store the time and memory used by each mapping stage",
+    )
+
+    parser.add_argument(
+        "--nature",
+        type=str,
+        default="IntensiveMaximum",
+        help="physical nature of the field",
+    )
+
+
+_commands = {"series": series, "batch": batch, "serve": serve}
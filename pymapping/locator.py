@@ -0,0 +1,221 @@
+import numpy as np
+
+from .partition import cell_blocks
+
+# Celltypes supported in each dimension, and splitting of the non-simplicial
+# ones into simplices (lines, triangles or tetrahedra) covering them
+celltypes = {
+    1: ["line"],
+    2: ["triangle", "quad"],
+    3: ["tetra", "pyramid", "hexahedron"],
+}
+simplex_splits = {
+    "quad": [[0, 1, 2], [0, 2, 3]],
+    "pyramid": [[0, 1, 2, 4], [0, 2, 3, 4]],
+    "hexahedron": [
+        [0, 1, 2, 6],
+        [0, 2, 3, 6],
+        [0, 3, 7, 6],
+        [0, 7, 4, 6],
+        [0, 4, 5, 6],
+        [0, 5, 1, 6],
+    ],
+}
+
+
+class CellLocator:
+    """
+    Spatial index locating points in a ``meshio`` mesh, based on a KD-tree of
+    the cell centroids and batched barycentric coordinate tests. Quadrangles,
+    pyramids and hexahedra are split into simplices, in which point fields
+    are interpolated linearly.
+
+    Args:
+        mesh (meshio mesh): Mesh made of lines in 1D, triangles or quadrangles
+                            in 2D, or tetrahedra, pyramids or hexahedra in 3D
+        eps (float): Tolerance on barycentric coordinates for points
+                     on the boundary of cells
+        k (int): Number of nearest cell centroids tested first for each point
+    """
+
+    def __init__(self, mesh, eps=1e-12, k=8):
+        from scipy.spatial import cKDTree
+
+        self.points = mesh.points.reshape(len(mesh.points), -1)
+        dim = self.points.shape[1]
+        blocks = cell_blocks(mesh)
+        if dim not in celltypes or any(
+            celltype not in celltypes[dim] for celltype, _ in blocks
+        ):
+            raise ValueError(
+                "Only meshes made of {} cells in {}D are supported".format(
+                    " or ".join(celltypes.get(dim, ["simplex"])), dim
+                )
+            )
+
+        # Simplices and the cell of the mesh to which each one belongs
+        simplices = []
+        simplex_cells = []
+        ncells = 0
+        for celltype, data in blocks:
+            split = simplex_splits.get(celltype, [list(range(dim + 1))])
+            simplices.append(data[:, split].reshape(-1, dim + 1))
+            simplex_cells.append(
+                np.repeat(np.arange(ncells, ncells + len(data)), len(split))
+            )
+            ncells += len(data)
+        self.simplices = np.concatenate(simplices)
+        self.simplex_cells = np.concatenate(simplex_cells)
+        self.eps = eps
+        self.k = min(k, len(self.simplices))
+
+        # Affine maps from physical to barycentric coordinates
+        vertices = self.points[self.simplices]
+        self.origins = vertices[:, 0]
+        edges = (vertices[:, 1:] - self.origins[:, None]).transpose(0, 2, 1)
+        self.inverses = _inverse(edges)
+
+        centroids = vertices.mean(axis=1)
+        self.radius = np.max(np.linalg.norm(vertices - centroids[:, None], axis=2))
+        self.lower = self.points.min(axis=0)
+        self.upper = self.points.max(axis=0)
+        self.tree = cKDTree(centroids)
+
+    def barycentric(self, coords, simplex_ids):
+        """
+        Barycentric coordinates of points with respect to some simplices
+
+        Returns:
+            numpy array: Barycentric coordinates, of shape ``(npoints, dim + 1)``
+        """
+        coords = coords - self.origins[simplex_ids]
+        weights = np.einsum("nij,nj->ni", self.inverses[simplex_ids], coords)
+        return np.column_stack([1 - weights.sum(axis=1), weights])
+
+    def locate(self, coords):
+        """
+        Locate points in the mesh
+
+        Args:
+            coords (numpy array): Coordinates of the points
+
+        Returns:
+            tuple: Containing cell of each point (``-1`` if outside the mesh)
+                   and barycentric coordinates in the simplex of this cell
+                   containing the point, see :py:meth:`locate_simplices`
+        """
+        simplex_ids, weights = self.locate_simplices(coords)
+        cell_ids = simplex_ids.copy()
+        found = simplex_ids >= 0
+        cell_ids[found] = self.simplex_cells[simplex_ids[found]]
+        return cell_ids, weights
+
+    def locate_simplices(self, coords):
+        """
+        Locate points in the simplices of the mesh
+
+        Args:
+            coords (numpy array): Coordinates of the points
+
+        Returns:
+            tuple: Containing the row of ``simplices`` of each point
+                   (``-1`` if outside the mesh) and barycentric coordinates
+                   in this simplex
+        """
+        coords = np.asarray(coords, dtype=float).reshape(len(coords), -1)
+        npoints, dim = coords.shape
+        simplex_ids = np.full(npoints, -1)
+        weights = np.zeros((npoints, dim + 1))
+        if npoints == 0 or len(self.simplices) == 0:
+            return simplex_ids, weights
+
+        # Simplices of the k nearest centroids
+        _, candidates = self.tree.query(coords, k=self.k)
+        candidates = candidates.reshape(npoints, -1)
+        points = np.repeat(np.arange(npoints), candidates.shape[1])
+        self._test(coords, points, candidates.ravel(), simplex_ids, weights)
+
+        # Remaining points in the bounding box of the mesh: all simplices
+        # whose centroid is close enough
+        tol = self.eps * np.max(self.upper - self.lower, initial=1)
+        remaining = np.flatnonzero(
+            (simplex_ids < 0)
+            & np.all(coords >= self.lower - tol, axis=1)
+            & np.all(coords <= self.upper + tol, axis=1)
+        )
+        if len(remaining) > 0:
+            neighbors = self.tree.query_ball_point(coords[remaining], self.radius)
+            counts = np.array([len(n) for n in neighbors], dtype=int)
+            if counts.sum() > 0:
+                points = np.repeat(remaining, counts)
+                candidates = np.concatenate(neighbors).astype(int)
+                self._test(coords, points, candidates, simplex_ids, weights)
+
+        return simplex_ids, weights
+
+    def _test(self, coords, points, candidates, simplex_ids, weights):
+        """
+        Test candidate simplices and store the first one containing each point
+        """
+        weights_candidates = self.barycentric(coords[points], candidates)
+        inside = np.all(weights_candidates >= -self.eps, axis=1)
+        inside &= simplex_ids[points] < 0
+        points = points[inside]
+        points, first = np.unique(points, return_index=True)
+        simplex_ids[points] = candidates[inside][first]
+        weights[points] = weights_candidates[inside][first]
+
+    def interpolation_matrix(self, coords):
+        """
+        Linear interpolation matrix from the mesh points to given points,
+        with empty rows for points outside the mesh
+
+        Returns:
+            scipy.sparse.csr_matrix: Matrix of shape ``(npoints, npoints_mesh)``
+        """
+        import scipy.sparse
+
+        simplex_ids, weights = self.locate_simplices(coords)
+        found = simplex_ids >= 0
+        nvertices = self.simplices.shape[1]
+        indptr = np.zeros(len(simplex_ids) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(found * nvertices)
+        return scipy.sparse.csr_matrix(
+            (
+                weights[found].ravel(),
+                self.simplices[simplex_ids[found]].ravel(),
+                indptr,
+            ),
+            shape=(len(simplex_ids), len(self.points)),
+        )
+
+
+def _inverse(matrices):
+    """
+    Closed-form inverses of a stack of 1x1, 2x2 or 3x3 matrices, which are
+    much faster than ``np.linalg.inv`` for small matrices. Singular matrices
+    (degenerate cells) get ``nan`` inverses, so that no point is located in them.
+    """
+    dim = matrices.shape[1]
+    if dim == 1:
+        adjugate = np.ones_like(matrices)
+        det = matrices[:, 0, 0]
+    elif dim == 2:
+        a, b = matrices[:, 0, 0], matrices[:, 0, 1]
+        c, d = matrices[:, 1, 0], matrices[:, 1, 1]
+        adjugate = np.stack([np.stack([d, -b], 1), np.stack([-c, a], 1)], 1)
+        det = a * d - b * c
+    else:
+        # Rows of the adjugate are cross products of the columns
+        cols = matrices.transpose(0, 2, 1)
+        adjugate = np.stack(
+            [
+                np.cross(cols[:, 1], cols[:, 2]),
+                np.cross(cols[:, 2], cols[:, 0]),
+                np.cross(cols[:, 0], cols[:, 1]),
+            ],
+            1,
+        )
+        det = np.einsum("ni,ni->n", cols[:, 0], adjugate[:, 0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return adjugate / np.where(det == 0, np.nan, det)[:, None, None]
@@ -1,17 +1,58 @@
+import hashlib
+import os
+import tempfile
+import threading
 from copy import deepcopy
 
-import medcoupling as mc
+import meshio
 import numpy as np
 from meshio import CellBlock
 
+from .partition import (
+    bisect,
+    block_offsets,
+    block_order,
+    boxes_intersecting,
+    cell_blocks,
+    cell_bounding_boxes,
+    cell_centroids,
+    cells_in_box,
+    cells_touching,
+    extract_cells,
+    match_cells,
+    match_points,
+    points_of_cells,
+    select_cells,
+)
+from .stats import MapperStats, stage
+
+
+class _LazyModule:
+    """
+    Module imported on first attribute access, so that the numpy backend
+    neither needs medcoupling nor pays for its import
+    """
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        import importlib
+
+        return getattr(importlib.import_module(self._name), attr)
+
+
+mc = _LazyModule("medcoupling")
+
+# Values of the medcoupling NORM_POINT1, NORM_SEG2, ... cell types
 meshio_to_mc_type = {
-    "vertex": mc.NORM_POINT1,
-    "line": mc.NORM_SEG2,
-    "triangle": mc.NORM_TRI3,
-    "quad": mc.NORM_QUAD4,
-    "tetra": mc.NORM_TETRA4,
-    "pyramid": mc.NORM_PYRA5,
-    "hexahedron": mc.NORM_HEXA8,
+    "vertex": 0,
+    "line": 1,
+    "triangle": 3,
+    "quad": 4,
+    "tetra": 14,
+    "pyramid": 15,
+    "hexahedron": 18,
 }
 mc_to_meshio_type = {v: k for k, v in meshio_to_mc_type.items()}
 
@@ -65,6 +106,21 @@ def cleanup_mesh_meshio(mesh):
         mesh.cell_data[key] = list(cell_data[key].values())
 
 
+def _id_dtype(size):
+    """
+    Integer type of medcoupling indices, which depends on the way medcoupling
+    was built (32-bit or 64-bit indices)
+    """
+    if mc.MEDCouplingSizeOfIDs() == 64:
+        return np.int64
+    if size > np.iinfo(np.int32).max:
+        raise ValueError(
+            "Mesh too large for a medcoupling build with 32-bit indices, "
+            "a build with 64-bit indices is required"
+        )
+    return np.int32
+
+
 def mesh_mc_from_meshio(mesh, check=False):
     """
     Convert a meshio mesh to a medcoupling mesh
@@ -76,28 +132,38 @@ def mesh_mc_from_meshio(mesh, check=False):
     # Initialization
     mesh_mc = mc.MEDCouplingUMesh("mesh", meshdim(mesh))
 
-    # Point coordinates
-    coords = mc.DataArrayDouble(mesh.points.copy())
+    # Point coordinates: medcoupling shares the memory of the numpy array it
+    # is given, so the points of the meshio mesh are copied exactly once
+    coords = mc.DataArrayDouble(np.array(mesh.points, dtype=np.float64, order="C"))
     mesh_mc.setCoords(coords)
 
-    # Cells
-    cells_dict = mesh.cells_dict
-    conn = np.array([], dtype=np.int32)
-    conn_index = np.array([], dtype=np.int32)
-    for celltype in cells_dict:
-        celltype_ = meshio_to_mc_type[celltype]
-        ncells_celltype, npoints_celltype = cells_dict[celltype].shape
-        col_celltype = celltype_ * np.ones((ncells_celltype, 1), dtype=np.int32)
-        conn_celltype = np.hstack([col_celltype, cells_dict[celltype]]).flatten()
-        conn_index_celltype = len(conn) + (1 + npoints_celltype) * np.arange(
-            ncells_celltype, dtype=np.int32
+    # Cell blocks grouped by celltype, in the order of mesh.cells_dict
+    blocks = [
+        (meshio_to_mc_type[celltype], data) for celltype, data in cell_blocks(mesh)
+    ]
+
+    # Cells: each one is stored as [celltype, point_0, ..., point_n] in
+    # a single preallocated buffer
+    ncells = sum(len(data) for _, data in blocks)
+    len_conn = sum(data.size + len(data) for _, data in blocks)
+    dtype = _id_dtype(max(len_conn, len(mesh.points)))
+    conn = np.empty(len_conn, dtype=dtype)
+    conn_index = np.empty(ncells + 1, dtype=dtype)
+    begin = 0
+    begin_cell = 0
+    for celltype_mc, data in blocks:
+        ncells_block, npoints_cell = data.shape
+        end = begin + ncells_block * (1 + npoints_cell)
+        conn_block = conn[begin:end].reshape(ncells_block, 1 + npoints_cell)
+        conn_block[:, 0] = celltype_mc
+        conn_block[:, 1:] = data
+        conn_index[begin_cell : begin_cell + ncells_block] = np.arange(
+            begin, end, 1 + npoints_cell, dtype=dtype
         )
-        conn = np.hstack([conn, conn_celltype])
-        conn_index = np.hstack([conn_index, conn_index_celltype])
-    conn_index = np.hstack([conn_index, [len(conn)]]).astype(np.int32)
-    conn = mc.DataArrayInt(conn.astype(np.int32))
-    conn_index = mc.DataArrayInt(conn_index)
-    mesh_mc.setConnectivity(conn, conn_index)
+        begin = end
+        begin_cell += ncells_block
+    conn_index[-1] = len_conn
+    mesh_mc.setConnectivity(mc.DataArrayInt(conn), mc.DataArrayInt(conn_index))
 
     if check:
         mesh_mc.checkConsistency()
@@ -105,7 +171,12 @@ def mesh_mc_from_meshio(mesh, check=False):
 
 
 def field_mc_from_meshio(
-    mesh, field_name, on="points", mesh_mc=None, nature="IntensiveMaximum"
+    mesh,
+    field_name,
+    on="points",
+    mesh_mc=None,
+    nature="IntensiveMaximum",
+    cell_offsets=None,
 ):
     """
     Convert a meshio field to a medcoupling field
@@ -116,6 +187,8 @@ def field_mc_from_meshio(
         on (str): Support of the field (``points`` or ``cells``)
         mesh_mc (medcoupling mesh): MEDCoupling mesh of the current ``meshio`` mesh
         nature (str): Physical nature of the field (``IntensiveMaximum``, ``IntensiveConservation``, ``ExtensiveMaximum`` or ``ExtensiveConservation``)
+        cell_offsets (numpy array): Cell ranges of the blocks of the mesh, see
+                                    :py:func:`~.partition.block_offsets`
     """
     assert on in ["points", "cells"]
     if on == "points":
@@ -130,37 +203,373 @@ def field_mc_from_meshio(
     # Point fields
     if on == "points":
         assert field_name in mesh.point_data
-        field.setArray(mc.DataArrayDouble(mesh.point_data[field_name].copy()))
+        field.setArray(
+            mc.DataArrayDouble(np.array(mesh.point_data[field_name], dtype=np.float64))
+        )
     else:
         # Cell fields
         assert on == "cells"
-        assert field_name in mesh.cell_data_dict
-        array = None
-        celltypes_mc = mesh_mc.getAllGeoTypesSorted()
-        for celltype_mc in celltypes_mc:
-            celltype = mc_to_meshio_type[celltype_mc]
-            assert celltype in mesh.cell_data_dict[field_name]
-            values = mesh.cell_data_dict[field_name][celltype]
-            if array is None:
-                array = values
-            else:
-                array = np.concatenate([array, values])
-        field.setArray(mc.DataArrayDouble(array))
+        assert field_name in mesh.cell_data
+        array = _cell_array_from_meshio(mesh, mesh.cell_data[field_name], cell_offsets)
+        field.setArray(
+            mc.DataArrayDouble(np.ascontiguousarray(array, dtype=np.float64))
+        )
 
     field.setNature(eval("mc." + nature))
     return field
 
 
+def _cell_array_from_meshio(mesh, values, offsets=None):
+    """
+    Concatenate cell values given per block of ``mesh.cells`` (as in ``mesh.cell_data``)
+    following the cell ordering of the medcoupling mesh
+
+    Args:
+        offsets (numpy array): Cell ranges of the blocks, see
+                               :py:func:`~.partition.block_offsets`
+    """
+    assert len(values) == len(mesh.cells)
+    if len(values) == 1:
+        return values[0]
+    if offsets is None:
+        offsets = block_offsets(mesh)
+    first = np.asarray(values[0])
+    array = np.empty(
+        (int(offsets[:, 1].max()),) + first.shape[1:], dtype=np.result_type(*values)
+    )
+    for (begin, end), values_block in zip(offsets, values):
+        array[begin:end] = values_block
+    return array
+
+
+def _cell_data_from_array(array, mesh, offsets=None):
+    """
+    Split an array defined on the cells of the medcoupling mesh into
+    a list of arrays (views) following the blocks of ``mesh.cells``
+    """
+    if offsets is None:
+        offsets = block_offsets(mesh)
+    return [array[begin:end] for begin, end in offsets]
+
+
+def _output_mesh_meshio(mesh, copy=True):
+    """
+    Mesh to which mapped fields are attached: either a copy of ``mesh``, or
+    a lightweight mesh sharing read-only views of its points, cells and data,
+    and its field data and sets
+    """
+    assert mesh is not None
+    if copy:
+        return deepcopy(mesh)
+
+    def readonly(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    return meshio.Mesh(
+        readonly(mesh.points),
+        [CellBlock(cells.type, readonly(cells.data)) for cells in mesh.cells],
+        point_data={name: readonly(data) for name, data in mesh.point_data.items()},
+        cell_data={
+            name: [readonly(data_block) for data_block in data]
+            for name, data in mesh.cell_data.items()
+        },
+        field_data=mesh.field_data,
+        point_sets=mesh.point_sets,
+        cell_sets=mesh.cell_sets,
+    )
+
+
+def _number_of_entities(mesh, on):
+    if on == "points":
+        return len(mesh.points)
+    return sum(len(data) for _, data in cell_blocks(mesh))
+
+
+def _mesh_counts(mesh, name):
+    """
+    Sizes of a meshio mesh recorded in :py:class:`~.MapperStats`
+    """
+    return {
+        "mesh": name,
+        "npoints": len(mesh.points),
+        "ncells": _number_of_entities(mesh, "cells"),
+    }
+
+
+def _expand_matrix(matrix, shape, rows=None, cols=None):
+    """
+    Embed a matrix computed on submeshes into the matrix of the full meshes
+
+    Args:
+        matrix (scipy.sparse.csr_matrix): Matrix on the submeshes
+        shape (tuple): Shape of the matrix on the full meshes
+        rows (numpy array): Indices in the full target mesh of the rows
+        cols (numpy array): Indices in the full source mesh of the columns
+    """
+    import scipy.sparse
+
+    matrix = matrix.tocoo()
+    row = matrix.row if rows is None else rows[matrix.row]
+    col = matrix.col if cols is None else cols[matrix.col]
+    return scipy.sparse.csr_matrix((matrix.data, (row, col)), shape=shape)
+
+
+def _owned_entries(matrix, rows, cols, owned):
+    """
+    Entries of the rows of owned target entities of a matrix computed on
+    submeshes, with indices in the full meshes
+
+    Returns:
+        tuple: Values, rows and columns of the entries
+    """
+    matrix = matrix.tocoo()
+    keep = owned[rows[matrix.row]]
+    return matrix.data[keep], rows[matrix.row[keep]], cols[matrix.col[keep]]
+
+
+def _assemble_matrix(entries, shape):
+    """
+    Interpolation matrix from lists of values, rows and columns of its entries
+    """
+    import scipy.sparse
+
+    if len(entries) == 0:
+        return scipy.sparse.csr_matrix(shape)
+    data, row, col = (np.concatenate(arrays) for arrays in zip(*entries))
+    return scipy.sparse.csr_matrix((data, (row, col)), shape=shape)
+
+
+def _remapper_options(mapper):
+    """
+    Main options of a ``MEDCouplingRemapper``, as a picklable ``dict``
+    """
+    return {
+        "IntersectionType": mapper.getIntersectionType(),
+        "Precision": mapper.getPrecision(),
+        "BoundingBoxAdjustment": mapper.getBoundingBoxAdjustment(),
+        "BoundingBoxAdjustmentAbs": mapper.getBoundingBoxAdjustmentAbs(),
+        "MeasureAbsStatus": mapper.getMeasureAbsStatus(),
+    }
+
+
+def _set_intersection_type(mapper, method, intersection_type):
+    """
+    Set the intersection type of a ``MEDCouplingRemapper``, ``PointLocator``
+    by default for the methods on source points
+    """
+    if intersection_type is not None:
+        mapper.setIntersectionType(eval("mc." + intersection_type))
+    elif method[:2] == "P1":
+        mapper.setIntersectionType(mc.PointLocator)
+
+
+def _prepare_matrix(mesh_source, mesh_target, method, options):
+    """
+    Interpolation matrix between two meshes, computed by a new ``MEDCouplingRemapper``
+    """
+    mapper = mc.MEDCouplingRemapper()
+    mapper.setIntersectionType(options["IntersectionType"])
+    mapper.setPrecision(options["Precision"])
+    mapper.setBoundingBoxAdjustment(options["BoundingBoxAdjustment"])
+    mapper.setBoundingBoxAdjustmentAbs(options["BoundingBoxAdjustmentAbs"])
+    mapper.setMeasureAbsStatus(options["MeasureAbsStatus"])
+    mapper.prepare(
+        mesh_mc_from_meshio(mesh_source), mesh_mc_from_meshio(mesh_target), method
+    )
+    return mapper.getCrudeCSRMatrix()
+
+
+def _prepare_worker(
+    mesh_source, mesh_target, method, intersection_type, options, crop, backend, cache
+):
+    """
+    Interpolation matrix of a :py:meth:`~.Mapper.prepare` run in a worker process
+    """
+    mapper = Mapper(verbose=False, cache=cache, backend=backend)
+    for name, value in options.items():
+        getattr(mapper._mapper, "set" + name)(value)
+    mapper.prepare(mesh_source, mesh_target, method, intersection_type, crop=crop)
+    return mapper._crude_matrix()
+
+
+# Executors shared by the mappers run in the background, created on first use
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _default_executor(kind):
+    """
+    Shared process pool (``process``) or thread pool (``thread``)
+    """
+    with _executors_lock:
+        if kind not in _executors:
+            from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+            if kind == "process":
+                _executors[kind] = ProcessPoolExecutor()
+            else:
+                _executors[kind] = ThreadPoolExecutor()
+        return _executors[kind]
+
+
+class MatrixCache:
+    """
+    On-disk cache of prepared interpolation matrices
+
+    Each entry is keyed by a fingerprint of both medcoupling meshes, the mapping
+    method and the intersection type, and is stored as an uncompressed ``.npz``
+    file holding the CSR arrays of the matrix. When the total size of the cache
+    exceeds ``max_size``, the least recently used entries are evicted.
+
+    Args:
+        directory (str): Directory where the matrices are stored
+        max_size (int): Maximum total size in bytes of the cache (``None`` for no limit)
+    """
+
+    def __init__(self, directory, max_size=1024**3):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(
+        self, mesh_source_mc, mesh_target_mc, method, intersection_type, options=None
+    ):
+        """
+        Fingerprint of a source/target mesh pair for a given method,
+        intersection type and options of the ``MEDCouplingRemapper``
+        (precision, bounding box adjustments...)
+
+        Returns:
+            str: Hexadecimal digest identifying the interpolation matrix
+        """
+        h = hashlib.sha1()
+        h.update(
+            "{};{};{}".format(
+                method, intersection_type, mc.MEDCouplingVersionStr()
+            ).encode()
+        )
+        if options is not None:
+            h.update(repr(sorted(options.items())).encode())
+        for mesh_mc in [mesh_source_mc, mesh_target_mc]:
+            coords = mesh_mc.getCoords()
+            h.update(
+                "{};{};{}".format(
+                    mesh_mc.getMeshDimension(),
+                    coords.getNumberOfComponents(),
+                    mesh_mc.getNumberOfCells(),
+                ).encode()
+            )
+            h.update(coords.toNumPyArray().tobytes())
+            h.update(mesh_mc.getNodalConnectivity().toNumPyArray().tobytes())
+            h.update(mesh_mc.getNodalConnectivityIndex().toNumPyArray().tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def load(self, key):
+        """
+        Return the cached matrix as a ``scipy.sparse.csr_matrix``,
+        or ``None`` if the key is not in the cache
+        """
+        import scipy.sparse
+
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                matrix = scipy.sparse.csr_matrix(
+                    (data["data"], data["indices"], data["indptr"]),
+                    shape=tuple(data["shape"]),
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+        # Mark as recently used, unless it was evicted meanwhile
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return matrix
+
+    def store(self, key, matrix):
+        """
+        Store a ``scipy.sparse.csr_matrix`` in the cache, then evict the
+        least recently used entries if the cache is too large
+        """
+        if matrix.nnz < np.iinfo(np.int32).max:
+            index_dtype = np.int32
+        else:
+            index_dtype = np.int64
+
+        # Write to a temporary file first so that concurrent readers never see
+        # a partially written entry, nor other writers evict it
+        fd, tmpfile = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                data=matrix.data,
+                indices=matrix.indices.astype(index_dtype, copy=False),
+                indptr=matrix.indptr.astype(index_dtype, copy=False),
+                shape=np.array(matrix.shape, dtype=np.int64),
+            )
+        os.replace(tmpfile, self._path(key))
+        self._evict()
+
+    def clear(self):
+        """
+        Remove all entries of the cache
+        """
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _entries(self):
+        return [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith(".npz")
+        ]
+
+    def _evict(self):
+        if self.max_size is None:
+            return
+
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        size = sum(entry[1] for entry in entries)
+        for _, size_entry, path in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= size_entry
+
+
 class MappingResult:
     """
     Container class for mapped field on the target mesh
     """
 
-    def __init__(self, field_target, mesh_target=None):
+    def __init__(self, field_target, mesh_target=None, stats=None, cell_offsets=None):
         self.field_target = field_target
         self.dis = self.field_target.getDiscretization()
 
         self.mesh_target = mesh_target
+        self.stats = stats
+        self.cell_offsets = cell_offsets
 
     def array(self):
         """
@@ -181,47 +590,110 @@ class MappingResult:
         """
         Export the mapped field to a VTK file
         """
-        self.field_target.writeVTK(vtkfile)
+        with stage(self.stats, "export", format="vtk"):
+            self.field_target.writeVTK(vtkfile)
 
-    def mesh_meshio(self):
+    def mesh_meshio(self, copy=True, mesh=None):
         """
         Return the ``meshio`` mesh object containing the
         mapped field
+
+        Args:
+            copy (bool): Whether to copy the target mesh, otherwise the returned mesh
+                         shares read-only points and cells with the target mesh
+            mesh (meshio mesh): Mesh to which the mapped field is attached instead,
+                                e.g. returned by a previous call
         """
-        assert self.mesh_target is not None
-        mesh_target = deepcopy(self.mesh_target)
-        name = self.field_target.getName()
+        with stage(self.stats, "export", format="meshio", nfields=1):
+            offsets = self.cell_offsets
+            if mesh is None:
+                mesh = _output_mesh_meshio(self.mesh_target, copy)
+            else:
+                offsets = None
+            name = self.field_target.getName()
 
-        # Point fields
-        array = self.array()
-        if self.dis.getRepr() == "P1":
-            mesh_target.point_data[name] = array
-        else:
-            # Cell fields
-            mesh_mc = self.field_target.getMesh()
-            celltypes_mc = mesh_mc.getAllGeoTypesSorted()
-            begin = None
-            end = None
-            cell_data = {}
-            for celltype_mc in celltypes_mc:
-                celltype = mc_to_meshio_type[celltype_mc]
-                len_mesh_celltype = mesh_mc.getNumberOfCellsWithType(celltype_mc)
-                if begin is None:
-                    begin = 0
-                    end = len_mesh_celltype
-                else:
-                    begin = end
-                    end = begin + len_mesh_celltype
-                cell_data[celltype] = array[begin:end]
+            # Point fields
+            array = self.array()
+            if self.dis.getRepr() == "P1":
+                mesh.point_data[name] = array
+            else:
+                # Cell fields
+                mesh.cell_data[name] = _cell_data_from_array(array, mesh, offsets)
 
-            mesh_target.cell_data[name] = []
-            for celltype in mesh_target.cells_dict.keys():
-                for key in cell_data:
-                    if celltype == key:
-                        mesh_target.cell_data[name].append(cell_data[key])
-                        break
+        return mesh
 
-        return mesh_target
+
+class MappingResults:
+    """
+    Container class for several mapped fields on the target mesh, stored
+    column-wise in a single 2D array
+
+    Args:
+        block (numpy array): Mapped values, one row per target discretization point
+        columns (dict): Column slice and component shape of each field
+        on (str): Support of the fields (``points`` or ``cells``)
+        mesh_target (meshio mesh): Target mesh
+        stats (MapperStats): Measurements to which the export stages are added
+        cell_offsets (numpy array): Cell ranges of the blocks of the target mesh,
+                                    see :py:func:`~.partition.block_offsets`
+    """
+
+    def __init__(
+        self, block, columns, on, mesh_target=None, stats=None, cell_offsets=None
+    ):
+        self.block = block
+        self.columns = columns
+        self.on = on
+        self.mesh_target = mesh_target
+        self.stats = stats
+        self.cell_offsets = cell_offsets
+
+    def __contains__(self, field_name):
+        return field_name in self.columns
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __getitem__(self, field_name):
+        return self.array(field_name)
+
+    def array(self, field_name):
+        """
+        Return the ``numpy`` array of a mapped field, as a view
+        of the underlying block (no copy is made)
+        """
+        cols, shape = self.columns[field_name]
+        if shape == ():
+            return self.block[:, cols.start]
+        return self.block[:, cols].reshape((len(self.block),) + shape)
+
+    def mesh_meshio(self, copy=True, mesh=None):
+        """
+        Return the ``meshio`` mesh object containing all the
+        mapped fields
+
+        Args:
+            copy (bool): Whether to copy the target mesh, otherwise the returned mesh
+                         shares read-only points and cells with the target mesh
+            mesh (meshio mesh): Mesh to which the mapped fields are attached instead,
+                                e.g. returned by a previous call
+        """
+        with stage(self.stats, "export", format="meshio", nfields=len(self)):
+            offsets = self.cell_offsets
+            if mesh is None:
+                mesh = _output_mesh_meshio(self.mesh_target, copy)
+            else:
+                offsets = None
+            for name in self.columns:
+                array = self.array(name)
+                if self.on == "points":
+                    mesh.point_data[name] = array
+                else:
+                    mesh.cell_data[name] = _cell_data_from_array(array, mesh, offsets)
+        return mesh
 
 
 class Mapper:
@@ -230,10 +702,28 @@ class Mapper:
 
     Args:
         verbose (bool): Whehter print out progress information
+        cache (str or MatrixCache): Cache of prepared interpolation matrices,
+                                    or a directory in which such a cache is created
+        backend (str): Engine computing the interpolation matrix: ``medcoupling``, or
+                       ``numpy`` for ``P1P1`` and ``P1P0`` point location in
+                       source meshes supported by :py:class:`~.locator.CellLocator`,
+                       with which :py:meth:`~.Mapper.transfer_many` does not need
+                       medcoupling
+        hooks (list): Callables invoked with the :py:class:`~.StageRecord` of each
+                      completed stage, see :py:attr:`~.Mapper.stats`
     """
 
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, cache=None, backend="medcoupling", hooks=None):
+        # Guards the remapper and the lazily computed data, so that transfers
+        # may run concurrently on a prepared mapper
+        self._lock = threading.RLock()
         self.verbose = verbose
+        self.stats = MapperStats(hooks)
+        if isinstance(cache, str):
+            cache = MatrixCache(cache)
+        self.cache = cache
+        assert backend in ["medcoupling", "numpy"]
+        self.backend = backend
 
         self.mesh_source = None
         self.mesh_source_mc = None
@@ -242,41 +732,851 @@ class Mapper:
         self.field_source = None
         self.field_target = None
 
-        self._mapper = mc.MEDCouplingRemapper()
+        self.method = None
+        self._mapper_mc = None
+        self._mapper_ready = False
+        self._matrix = None
+        self._denominators = {}
+        self._reverse = None
+        self._selection = None
+
+    @property
+    def _mapper(self):
+        """
+        ``MEDCouplingRemapper`` holding the options and the preparation,
+        created on first use
+        """
+        with self._lock:
+            if self._mapper_mc is None:
+                self._mapper_mc = mc.MEDCouplingRemapper()
+                if self.backend == "numpy" and self.method is not None:
+                    _set_intersection_type(self._mapper_mc, self.method, None)
+            return self._mapper_mc
+
+    @_mapper.setter
+    def _mapper(self, mapper):
+        self._mapper_mc = mapper
+
+    @property
+    def mesh_source_mc(self):
+        """
+        MEDCoupling mesh of the source mesh, converted on first use
+        """
+        with self._lock:
+            if self._mesh_source_mc is None and self.mesh_source is not None:
+                with self.stats.stage(
+                    "mesh_mc_from_meshio", **_mesh_counts(self.mesh_source, "source")
+                ):
+                    self._mesh_source_mc = mesh_mc_from_meshio(self.mesh_source)
+            return self._mesh_source_mc
+
+    @mesh_source_mc.setter
+    def mesh_source_mc(self, mesh_mc):
+        # Reset along with the medcoupling mesh whenever the source mesh changes
+        self._mesh_source_mc = mesh_mc
+        self._source_boxes = None
+        self._source_offsets = None
+
+    def _source_bounding_boxes(self):
+        """
+        Bounding boxes of the source cells, computed on first use
+        """
+        with self._lock:
+            if self._source_boxes is None:
+                self._source_boxes = cell_bounding_boxes(self.mesh_source)
+            return self._source_boxes
+
+    @property
+    def mesh_target_mc(self):
+        """
+        MEDCoupling mesh of the target mesh, converted on first use
+        """
+        with self._lock:
+            if self._mesh_target_mc is None and self.mesh_target is not None:
+                with self.stats.stage(
+                    "mesh_mc_from_meshio", **_mesh_counts(self.mesh_target, "target")
+                ):
+                    self._mesh_target_mc = mesh_mc_from_meshio(self.mesh_target)
+            return self._mesh_target_mc
+
+    @mesh_target_mc.setter
+    def mesh_target_mc(self, mesh_mc):
+        self._mesh_target_mc = mesh_mc
+        self._target_offsets = None
+
+    def _cell_offsets(self, mesh="source"):
+        """
+        Range of the cells of each block of ``mesh.cells`` in the cell ordering
+        of the medcoupling mesh, computed once per mesh: cell fields are gathered
+        and scattered block by block with it, without intermediate arrays
+
+        Args:
+            mesh (str): ``source`` or ``target``
 
-    def prepare(self, mesh_source, mesh_target, method="P1P0", intersection_type=None):
+        Returns:
+            numpy array: First and past-the-end cell indices of each block
+        """
+        with self._lock:
+            if mesh == "source":
+                if self._source_offsets is None:
+                    self._source_offsets = block_offsets(self.mesh_source)
+                return self._source_offsets
+            assert mesh == "target"
+            if self._target_offsets is None:
+                self._target_offsets = block_offsets(self.mesh_target)
+            return self._target_offsets
+
+    def prepare(
+        self,
+        mesh_source,
+        mesh_target,
+        method="P1P0",
+        intersection_type=None,
+        workers=1,
+        crop=True,
+        matrix=None,
+        source_cells=None,
+        target_cells=None,
+    ):
         """
         Prepare field mapping between meshes, must be run before
         :py:meth:`~.Mapper.transfer`. The source mesh must contain
         the field that you want to transfer to the target mesh.
 
+        The mapping may be restricted to some cells of the source and target
+        meshes, e.g. a physical group of a gmsh mesh: the interpolation matrix
+        is only computed on these submeshes, and mapped fields keep the size of
+        the full target mesh with the default value out of the selected cells.
+
         Args:
             mesh_source (meshio mesh): Source mesh
             mesh_target (meshio mesh): Target mesh
             method (str): Mapping methods: ``P1P0``, ``P1P1``, ``P0P0`` or ``P0P1``
             intersection_type (str): Intersection algorithm depending on meshes and the method
                                      Most used types: ``Triangulation``, ``PointLocator``
+            workers (int): Number of processes computing the interpolation matrix,
+                           each of them on a part of the target mesh
+            crop (bool): Whether to discard the source cells far from the target mesh
+                         before computing the interpolation matrix
+            matrix (scipy.sparse.csr_matrix): Interpolation matrix already computed for
+                                              these meshes, e.g. in another process
+            source_cells: Selection of the source cells used by the mapping:
+                          ``(name, values)`` for the cells whose cell data ``name``
+                          is one of ``values``, indices or mask of the cells, or
+                          a predicate on their centroids, see
+                          :py:func:`~.partition.select_cells`
+            target_cells: Selection of the target cells on which fields are mapped
+        """
+        with self._lock:
+            self._set_method(method, intersection_type)
+            selected = source_cells is not None or target_cells is not None
+            if selected and self.backend == "numpy":
+                raise ValueError("The numpy backend does not support cell selections")
+
+            # Medcoupling meshes are converted on first use: neither the numpy
+            # backend nor a cropped preparation need the full source mesh
+            self._print("Loading source mesh...")
+            with self.stats.stage("cleanup_mesh_meshio", mesh="source"):
+                cleanup_mesh_meshio(mesh_source)
+            self.mesh_source = mesh_source
+            self.mesh_source_mc = None
+
+            self._print("Loading target mesh...")
+            with self.stats.stage("cleanup_mesh_meshio", mesh="target"):
+                cleanup_mesh_meshio(mesh_target)
+            self.mesh_target = mesh_target
+            self.mesh_target_mc = None
+
+            with self.stats.stage(
+                "prepare", method=method, backend=self.backend, workers=workers
+            ) as counts:
+                if selected:
+                    self._selection = [
+                        None if cells is None else select_cells(mesh, cells)
+                        for mesh, cells in [
+                            (mesh_source, source_cells),
+                            (mesh_target, target_cells),
+                        ]
+                    ]
+                    if matrix is None:
+                        matrix = self._prepare_selected(*self._selection)
+                elif matrix is None:
+                    matrix = self._prepare_matrix(method, workers, crop)
+                if matrix is not None:
+                    counts["nnz"] = matrix.nnz
+
+            if matrix is not None:
+                self._set_matrix(matrix)
+
+    def _set_method(self, method, intersection_type):
+        """
+        Select the method and the intersection type, and discard
+        the previous preparation
         """
-        # Select intersection type
         assert method in ["P1P0", "P1P1", "P0P0", "P0P1"]
-        if intersection_type is not None:
-            self._mapper.setIntersectionType(eval("mc." + intersection_type))
-        elif method[:2] == "P1":
-            self._mapper.setIntersectionType(mc.PointLocator)
+        if self.backend == "numpy" and (
+            method not in ["P1P1", "P1P0"]
+            or intersection_type not in [None, "PointLocator"]
+        ):
+            raise ValueError(
+                "The numpy backend only supports the P1P1 and P1P0 methods "
+                "with the PointLocator intersection type"
+            )
+        if self.backend != "numpy":
+            _set_intersection_type(self._mapper, method, intersection_type)
+        elif self._mapper_mc is not None:
+            _set_intersection_type(self._mapper_mc, method, None)
         self.method = method
+        self._selection = None
+        self._mapper_ready = False
+        self._matrix = None
+        self._denominators = {}
+        self._reverse = None
 
-        self._print("Loading source mesh...")
-        cleanup_mesh_meshio(mesh_source)
-        self.mesh_source = mesh_source
-        self.mesh_source_mc = mesh_mc_from_meshio(mesh_source)
+    def _prepare_matrix(self, method, workers, crop):
+        """
+        Interpolation matrix from the cache or computed by a backend, or ``None`` if
+        it was computed by the ``MEDCouplingRemapper`` on the full meshes
+        """
+        matrix = None
+        if self.cache is not None:
+            key = self.cache.key(
+                self.mesh_source_mc,
+                self.mesh_target_mc,
+                method,
+                self._mapper.getIntersectionTypeRepr(),
+                _remapper_options(self._mapper),
+            )
+            matrix = self.cache.load(key)
+            if matrix is not None:
+                self._print("Loading cached interpolation matrix...")
 
-        self._print("Loading target mesh...")
-        cleanup_mesh_meshio(mesh_target)
-        self.mesh_target = mesh_target
-        self.mesh_target_mc = mesh_mc_from_meshio(mesh_target)
+        if matrix is None:
+            self._print("Preparing...")
+            if self.backend == "numpy":
+                matrix = self._prepare_numpy()
+            elif workers > 1:
+                matrix = self._prepare_parallel(workers)
+            elif crop:
+                matrix = self._prepare_cropped()
+            if matrix is None:
+                self._mapper.prepare(self.mesh_source_mc, self.mesh_target_mc, method)
+                self._mapper_ready = True
+            if self.cache is not None:
+                self.cache.store(
+                    key, self._crude_matrix() if matrix is None else matrix
+                )
+        return matrix
+
+    def _prepare_parallel(self, workers):
+        """
+        Compute the interpolation matrix in a process pool: the target mesh is
+        partitioned by recursive coordinate bisection, and each part is prepared
+        against the source cells whose bounding boxes intersect it
+        """
+        on_target = "points" if self.method[2:] == "P1" else "cells"
+
+        # Target entities (rows of the matrix) owned by each part
+        if on_target == "points":
+            points = self.mesh_target.points.reshape(len(self.mesh_target.points), -1)
+            labels = bisect(points, workers)
+        else:
+            labels = bisect(cell_centroids(self.mesh_target), workers)
 
-        self._print("Preparing...")
-        self._mapper.prepare(self.mesh_source_mc, self.mesh_target_mc, method)
+        lower, upper = self._source_bounding_boxes()
+        parts = []
+        tasks = []
+        for part in range(workers):
+            owned = labels == part
+            task = self._rows_task(owned, lower, upper)
+            if task is not None:
+                parts.append(task[:2] + (owned,))
+                tasks.append(task[2:])
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            matrices = list(executor.map(_prepare_matrix, *zip(*tasks)))
+
+        entries = [
+            _owned_entries(matrix, *part) for part, matrix in zip(parts, matrices)
+        ]
+        return _assemble_matrix(entries, self._matrix_shape())
+
+    def _rows_task(self, owned, lower, upper):
+        """
+        Submeshes on which the rows of the interpolation matrix of some target
+        entities are computed: the target cells needed by these rows, and the
+        source cells whose bounding boxes intersect them
+
+        Args:
+            owned (numpy array): Mask of the target entities
+            lower (numpy array): Lower corners of the source cell bounding boxes
+            upper (numpy array): Upper corners of the source cell bounding boxes
+
+        Returns:
+            tuple: Indices of the rows and columns of the submeshes, then the
+                   arguments of ``_prepare_matrix``, or ``None`` if no row is computed
+        """
+        on_source = "points" if self.method[:2] == "P1" else "cells"
+        on_target = "points" if self.method[2:] == "P1" else "cells"
+        if on_target == "points":
+            # All the cells around owned points are needed to compute their rows
+            cell_ids_target = cells_touching(self.mesh_target, owned)
+        else:
+            cell_ids_target = np.flatnonzero(owned)
+        if len(cell_ids_target) == 0:
+            return None
+        mesh_target, point_ids_target = extract_cells(self.mesh_target, cell_ids_target)
+
+        points = mesh_target.points.reshape(len(mesh_target.points), -1)
+        cell_ids_source = cells_in_box(
+            lower,
+            upper,
+            points.min(axis=0),
+            points.max(axis=0),
+            self._mapper.getBoundingBoxAdjustment(),
+            self._mapper.getBoundingBoxAdjustmentAbs(),
+        )
+        if len(cell_ids_source) == 0:
+            return None
+        mesh_source, point_ids_source = extract_cells(self.mesh_source, cell_ids_source)
+
+        rows = point_ids_target if on_target == "points" else cell_ids_target
+        cols = point_ids_source if on_source == "points" else cell_ids_source
+        options = _remapper_options(self._mapper)
+        return rows, cols, mesh_source, mesh_target, self.method, options
+
+    def _matrix_shape(self):
+        on_source = "points" if self.method[:2] == "P1" else "cells"
+        on_target = "points" if self.method[2:] == "P1" else "cells"
+        return (
+            _number_of_entities(self.mesh_target, on_target),
+            _number_of_entities(self.mesh_source, on_source),
+        )
+
+    def _prepare_cropped(self, ratio=0.9):
+        """
+        Compute the interpolation matrix on the source cells whose bounding boxes,
+        enlarged like medcoupling does, intersect the bounding box of the target mesh.
+        Return ``None`` if more than ``ratio`` of the source cells are kept.
+        """
+        lower, upper = self._source_bounding_boxes()
+        points = self.mesh_target.points.reshape(len(self.mesh_target.points), -1)
+        cell_ids = cells_in_box(
+            lower,
+            upper,
+            points.min(axis=0),
+            points.max(axis=0),
+            self._mapper.getBoundingBoxAdjustment(),
+            self._mapper.getBoundingBoxAdjustmentAbs(),
+        )
+        if len(cell_ids) > ratio * len(lower):
+            return None
+
+        shape = self._matrix_shape()
+        if len(cell_ids) == 0:
+            return _assemble_matrix([], shape)
+
+        mesh_source, point_ids = extract_cells(self.mesh_source, cell_ids)
+        self._mapper.prepare(
+            mesh_mc_from_meshio(mesh_source), self.mesh_target_mc, self.method
+        )
+        cols = point_ids if self.method[:2] == "P1" else cell_ids
+        return _expand_matrix(self._mapper.getCrudeCSRMatrix(), shape, cols=cols)
+
+    def _prepare_selected(self, source_ids, target_ids):
+        """
+        Compute the interpolation matrix on the selected target cells, and the
+        selected source cells whose bounding boxes intersect them only
+
+        Args:
+            source_ids (numpy array): Indices of the selected source cells,
+                                      all of them if ``None``
+            target_ids (numpy array): Indices of the selected target cells,
+                                      all of them if ``None``
+        """
+        shape = self._matrix_shape()
+        if target_ids is None:
+            target_ids = np.arange(len(cell_centroids(self.mesh_target)))
+        if len(target_ids) == 0:
+            return _assemble_matrix([], shape)
+        mesh_target, point_ids_target = extract_cells(self.mesh_target, target_ids)
+
+        lower, upper = self._source_bounding_boxes()
+        if source_ids is not None:
+            lower, upper = lower[source_ids], upper[source_ids]
+        points = mesh_target.points.reshape(len(mesh_target.points), -1)
+        cell_ids = cells_in_box(
+            lower,
+            upper,
+            points.min(axis=0),
+            points.max(axis=0),
+            self._mapper.getBoundingBoxAdjustment(),
+            self._mapper.getBoundingBoxAdjustmentAbs(),
+        )
+        if source_ids is not None:
+            cell_ids = source_ids[cell_ids]
+        if len(cell_ids) == 0:
+            return _assemble_matrix([], shape)
+        mesh_source, point_ids_source = extract_cells(self.mesh_source, cell_ids)
+
+        matrix = _prepare_matrix(
+            mesh_source, mesh_target, self.method, _remapper_options(self._mapper)
+        )
+        rows = point_ids_target if self.method[2:] == "P1" else target_ids
+        cols = point_ids_source if self.method[:2] == "P1" else cell_ids
+        return _expand_matrix(matrix, shape, rows, cols)
+
+    def _prepare_numpy(self):
+        """
+        Compute the interpolation matrix of ``P1P1`` and ``P1P0`` methods by
+        locating target points or cell centroids in the source mesh
+        """
+        from .locator import CellLocator
+
+        locator = CellLocator(self.mesh_source)
+        if self.method == "P1P1":
+            coords = self.mesh_target.points
+        else:
+            coords = cell_centroids(self.mesh_target)
+        return locator.interpolation_matrix(coords)
+
+    def update_target(self, mesh_target):
+        """
+        Update the prepared mapping to a new target mesh, in which some cells
+        were moved, added or removed. Only the rows of the interpolation matrix
+        of the target points or cells affected by these changes are recomputed.
+
+        Args:
+            mesh_target (meshio mesh): New target mesh
+        """
+        with self._lock:
+            if self._selection is not None:
+                raise ValueError(
+                    "Mappings restricted to selected cells cannot be updated"
+                )
+            self._print("Updating target mesh...")
+            with self.stats.stage("update_target") as counts:
+                cleanup_mesh_meshio(mesh_target)
+                matrix = self._crude_matrix()
+                cell_ids = match_cells(self.mesh_target, mesh_target)
+                if self.method[2:] == "P1":
+                    row_ids = match_points(self.mesh_target, mesh_target, cell_ids)
+                else:
+                    row_ids = cell_ids
+                self.mesh_target = mesh_target
+                self.mesh_target_mc = None
+
+                # Rows of unchanged target entities are moved, the others recomputed
+                kept = row_ids >= 0
+                matrix_kept = matrix[row_ids[kept]].tocoo()
+                entries = [
+                    (
+                        matrix_kept.data,
+                        np.flatnonzero(kept)[matrix_kept.row],
+                        matrix_kept.col,
+                    )
+                ]
+                entries += self._compute_rows(~kept)
+                counts["nrows"] = int(np.count_nonzero(~kept))
+                self._set_matrix(_assemble_matrix(entries, self._matrix_shape()))
+
+    def update_source(self, mesh_source):
+        """
+        Update the prepared mapping to a new source mesh, in which some cells
+        were moved, added or removed. Only the rows of the interpolation matrix
+        of the target points or cells affected by these changes are recomputed.
+
+        Args:
+            mesh_source (meshio mesh): New source mesh
+        """
+        with self._lock:
+            if self._selection is not None:
+                raise ValueError(
+                    "Mappings restricted to selected cells cannot be updated"
+                )
+            self._print("Updating source mesh...")
+            with self.stats.stage("update_source") as counts:
+                cleanup_mesh_meshio(mesh_source)
+                matrix = self._crude_matrix()
+                cell_ids = match_cells(self.mesh_source, mesh_source)
+                if self.method[:2] == "P1":
+                    col_ids = match_points(self.mesh_source, mesh_source, cell_ids)
+                else:
+                    col_ids = cell_ids
+                self.mesh_source = mesh_source
+                self.mesh_source_mc = None
+
+                # New indices of the columns of unchanged source entities
+                cols = np.full(matrix.shape[1], -1)
+                cols[col_ids[col_ids >= 0]] = np.flatnonzero(col_ids >= 0)
+
+                # Rows involving changed or removed source entities, and rows
+                # of the target entities close to new or moved source cells
+                rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+                changed = np.zeros(matrix.shape[0], dtype=bool)
+                changed[rows[cols[matrix.indices] < 0]] = True
+                lower, upper = self._source_bounding_boxes()
+                lower, upper = lower[cell_ids < 0], upper[cell_ids < 0]
+                margin = self._mapper.getBoundingBoxAdjustment() * np.max(
+                    upper - lower, axis=1, initial=0
+                )
+                margin += self._mapper.getBoundingBoxAdjustmentAbs()
+                changed |= self._rows_in_boxes(
+                    lower - margin[:, None], upper + margin[:, None]
+                )
+
+                kept = ~changed[rows]
+                entries = [(matrix.data[kept], rows[kept], cols[matrix.indices[kept]])]
+                entries += self._compute_rows(changed)
+                counts["nrows"] = int(np.count_nonzero(changed))
+                self._set_matrix(_assemble_matrix(entries, self._matrix_shape()))
+
+    def _compute_rows(self, owned, part_size=256):
+        """
+        Entries of the rows of the interpolation matrix of some target entities.
+        Scattered entities are split by recursive coordinate bisection into
+        compact parts of about ``part_size`` entities, each of them being
+        prepared against the source cells close to it only.
+
+        Args:
+            owned (numpy array): Mask of the target entities
+
+        Returns:
+            list: Values, rows and columns of the entries of each part
+        """
+        ids = np.flatnonzero(owned)
+        if len(ids) == 0:
+            return []
+        if self.method[2:] == "P1":
+            coords = self.mesh_target.points.reshape(len(self.mesh_target.points), -1)
+            coords = coords[ids]
+        else:
+            coords = cell_centroids(self.mesh_target)[ids]
+        labels = bisect(coords, -(-len(ids) // part_size))
+
+        lower, upper = self._source_bounding_boxes()
+        entries = []
+        for part in range(labels.max() + 1):
+            owned_part = np.zeros(len(owned), dtype=bool)
+            owned_part[ids[labels == part]] = True
+            task = self._rows_task(owned_part, lower, upper)
+            if task is not None:
+                matrix = _prepare_matrix(*task[2:])
+                entries.append(_owned_entries(matrix, *task[:2], owned_part))
+        return entries
+
+    def _rows_in_boxes(self, lower, upper):
+        """
+        Mask of the target entities whose rows may involve source cells
+        lying in some boxes
+        """
+        lower_target, upper_target = cell_bounding_boxes(self.mesh_target)
+        cell_mask = boxes_intersecting(lower_target, upper_target, lower, upper)
+        if self.method[2:] == "P1":
+            return points_of_cells(self.mesh_target, cell_mask)
+        return cell_mask
+
+    def reverse(self):
+        """
+        Mapper from the target mesh back to the source mesh, sharing the meshes
+        and the transposed interpolation matrix of this prepared mapper: no
+        preparation is run. Only intersection-based methods (e.g. ``Triangulation``)
+        are supported, for which it is the same as preparing the reverse mapping:
+        the transposed weights of ``PointLocator`` are not an interpolation.
+
+        Returns:
+            Mapper: Prepared mapper from ``mesh_target`` to ``mesh_source``
+        """
+        if not self._intersects():
+            raise ValueError(
+                "Reverse mappings require an intersection type other than "
+                "PointLocator and the medcoupling backend"
+            )
+        if self._reverse is None:
+            mapper = Mapper(verbose=self.verbose, backend=self.backend)
+            options = _remapper_options(self._mapper)
+            for name, value in options.items():
+                getattr(mapper._mapper, "set" + name)(value)
+            mapper.method = self.method[2:] + self.method[:2]
+            mapper.mesh_source = self.mesh_target
+            mapper.mesh_source_mc = self._mesh_target_mc
+            mapper.mesh_target = self.mesh_source
+            mapper.mesh_target_mc = self._mesh_source_mc
+            mapper._set_matrix(self._crude_matrix().T.tocsr())
+            self._reverse = mapper
+        return self._reverse
+
+    def transfer_back(self, fields, nature="IntensiveMaximum", default_value=np.nan):
+        """
+        Transfer several fields from the target mesh back to the source mesh,
+        after :py:meth:`~.Mapper.prepare`, with the mapper of :py:meth:`~.Mapper.reverse`.
+
+        Args:
+            fields (list or dict): Names of the fields defined in the target mesh,
+                                   or ``dict`` mapping names to target arrays,
+                                   see :py:meth:`~.Mapper.transfer_many`
+            nature (str or dict): Physical nature of the fields, possibly per field
+            default_value (float or dict): Default value when mapping is not possible,
+                                           possibly per field
+
+        Returns:
+            MappingResults: Fields mapped on the source mesh
+        """
+        return self.reverse().transfer_many(fields, nature, default_value)
+
+    def coverage(self, mesh="target"):
+        """
+        Fraction of the measure of each point (dual cell) or cell of a mesh
+        covered by the other mesh, from the sums of the rows (target mesh) or
+        columns (source mesh) of the interpolation matrix, after
+        :py:meth:`~.Mapper.prepare`. With ``PointLocator``, points or cells
+        are either mapped (``1``) or not (``0``).
+
+        Args:
+            mesh (str): ``target`` or ``source``
+
+        Returns:
+            numpy array: Covered fraction of each point or cell
+        """
+        assert mesh in ["target", "source"]
+        matrix = self._crude_matrix()
+        if not self._intersects():
+            covered = np.zeros(matrix.shape[0 if mesh == "target" else 1])
+            if mesh == "target":
+                covered[np.diff(matrix.indptr) > 0] = 1
+            else:
+                covered[matrix.indices[matrix.data != 0]] = 1
+            return covered
+
+        if mesh == "target":
+            sums = np.asarray(matrix.sum(axis=1)).ravel()
+            on = mc.ON_NODES if self.method[2:] == "P1" else mc.ON_CELLS
+            measure = self._measure(on, self.mesh_target_mc)
+        else:
+            sums = np.asarray(matrix.sum(axis=0)).ravel()
+            on = mc.ON_NODES if self.method[:2] == "P1" else mc.ON_CELLS
+            measure = self._measure(on, self.mesh_source_mc)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return sums / measure
+
+    def diagnostics(self, fields=None, tol=1e-6):
+        """
+        Coverage and conservation statistics of the prepared mapping, computed
+        from the interpolation matrix without transferring any field, so that
+        bad mappings are detected before mapping large fields
+
+        Args:
+            fields (list or dict): Source fields whose conservation is checked,
+                                   see :py:meth:`~.Mapper.transfer_many`
+            tol (float): Tolerance below which a point or cell is partially covered
+
+        Returns:
+            dict: ``unmapped``: number of target points or cells out of the source
+                  mesh, which receive the default value, and their ``unmapped_ratio``;
+                  ``target_coverage`` and ``source_coverage``: minimum and mean
+                  covered fraction, number of ``partial`` points or cells, and
+                  ``total`` covered fraction of the measure of the mesh, see
+                  :py:meth:`~.Mapper.coverage`; ``conservation``: for each field,
+                  ratio of its integral over the part of the source mesh covered
+                  by the target mesh to its integral over the source mesh
+                  (intersection types only)
+        """
+        with self.stats.stage("diagnostics"):
+            matrix = self._crude_matrix()
+            nrows, ncols = matrix.shape
+            unmapped = int(np.count_nonzero(np.diff(matrix.indptr) == 0))
+            report = {
+                "method": self.method,
+                "nrows": nrows,
+                "ncols": ncols,
+                "nnz": int(matrix.nnz),
+                "unmapped": unmapped,
+                "unmapped_ratio": unmapped / nrows if nrows > 0 else 0.0,
+            }
+
+            measures = {}
+            for mesh in ["target", "source"]:
+                coverage = self.coverage(mesh)
+                if self._intersects():
+                    measure = self._denominator(
+                        "IntensiveConservation"
+                        if mesh == "target"
+                        else "ExtensiveMaximum"
+                    )[1]
+                else:
+                    measure = np.ones(len(coverage))
+                measures[mesh] = measure
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    total = np.sum(coverage * measure) / np.sum(measure)
+                report[mesh + "_coverage"] = {
+                    "min": float(np.nanmin(coverage, initial=np.inf)),
+                    "mean": float(np.nanmean(coverage)) if len(coverage) > 0 else 1.0,
+                    "partial": int(np.count_nonzero(coverage < 1 - tol)),
+                    "total": float(total),
+                }
+
+            if fields is not None:
+                if not isinstance(fields, dict):
+                    fields = {name: None for name in fields}
+                report["conservation"] = {}
+                block_source, columns, _ = self._source_block(
+                    self._state(fields, "IntensiveMaximum"), fields, "IntensiveMaximum"
+                )
+                if self._intersects():
+                    sums = np.asarray(matrix.sum(axis=0)).ravel()
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        ratios = (sums @ block_source) / (
+                            measures["source"] @ block_source
+                        )
+                for name, (cols, shape) in columns.items():
+                    ratio = None
+                    if self._intersects():
+                        ratio = ratios[cols].reshape(shape).tolist()
+                    report["conservation"][name] = ratio
+        return report
+
+    def _intersects(self):
+        """
+        Whether the interpolation matrix holds intersection measures
+        (not ``PointLocator`` interpolation weights)
+        """
+        return (
+            self.backend != "numpy"
+            and self._mapper.getIntersectionType() != mc.PointLocator
+        )
+
+    def compact(self, tol=1e-6, dtype=np.float32, fields=None):
+        """
+        Store the prepared interpolation matrix in a compact form, after
+        :py:meth:`~.Mapper.prepare`: weights smaller than ``tol`` times the sum of
+        their row are dropped, the others are stored in ``dtype`` with the narrowest
+        index type supported by ``scipy``, and the data held by the
+        ``MEDCouplingRemapper`` is released. Fields of type ``dtype`` are then mapped
+        by :py:meth:`~.Mapper.transfer_many` without being upcast.
+
+        Args:
+            tol (float): Relative tolerance below which weights are dropped
+            dtype (numpy dtype): Type of the weights
+            fields (list or dict): Source fields whose conservation is compared
+                                   before and after, see :py:meth:`~.Mapper.diagnostics`
+
+        Returns:
+            dict: Number of ``dropped`` weights, ``memory`` of the matrix before and
+                  after in bytes, largest relative error on the sums of the rows
+                  (``row_sum_error``) and relative error on the sum of all weights
+                  (``integral_error``, that of the integral of a constant field
+                  for conservative natures), and ``conservation`` of the fields
+                  before and after
+        """
+        with self._lock:
+            import scipy.sparse
+
+            with self.stats.stage("compact") as counts:
+                matrix = self._crude_matrix()
+                report = {}
+                if fields is not None and self._intersects():
+                    conservation = self.diagnostics(fields)["conservation"]
+
+                # Weights of each row relative to its sum, computed in double precision
+                rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+                row_sums = np.bincount(
+                    rows, weights=matrix.data, minlength=matrix.shape[0]
+                )
+                kept = np.abs(matrix.data) >= tol * np.abs(row_sums)[rows]
+                index_dtype = np.int32
+                if (
+                    max(matrix.shape[1], np.count_nonzero(kept))
+                    > np.iinfo(np.int32).max
+                ):
+                    index_dtype = np.int64
+                indptr = np.zeros(matrix.shape[0] + 1, dtype=index_dtype)
+                np.cumsum(
+                    np.bincount(rows[kept], minlength=matrix.shape[0]), out=indptr[1:]
+                )
+                matrix_compact = scipy.sparse.csr_matrix(
+                    (
+                        matrix.data[kept].astype(dtype),
+                        matrix.indices[kept].astype(index_dtype),
+                        indptr,
+                    ),
+                    shape=matrix.shape,
+                )
+
+                row_sums_compact = np.bincount(
+                    rows[kept],
+                    weights=matrix_compact.data.astype(np.float64),
+                    minlength=matrix.shape[0],
+                )
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    row_errors = np.abs(row_sums_compact - row_sums) / np.abs(row_sums)
+                report["dropped"] = int(np.count_nonzero(~kept))
+                report["memory"] = [
+                    sum(a.nbytes for a in [m.data, m.indices, m.indptr])
+                    for m in [matrix, matrix_compact]
+                ]
+                report["row_sum_error"] = float(np.nanmax(row_errors, initial=0))
+                total = np.sum(row_sums)
+                report["integral_error"] = (
+                    float(abs(np.sum(row_sums_compact) - total) / abs(total))
+                    if total != 0
+                    else 0.0
+                )
+
+                # A new remapper with the same options, without the prepared data
+                options = _remapper_options(self._mapper)
+                self._mapper = mc.MEDCouplingRemapper()
+                for name, value in options.items():
+                    getattr(self._mapper, "set" + name)(value)
+                self._set_matrix(matrix_compact)
+                counts["nnz"] = matrix_compact.nnz
+                counts["dropped"] = report["dropped"]
+
+                if fields is not None and self._intersects():
+                    conservation_compact = self.diagnostics(fields)["conservation"]
+                    report["conservation"] = {
+                        name: [ratio, conservation_compact[name]]
+                        for name, ratio in conservation.items()
+                    }
+            return report
+
+    def _set_matrix(self, matrix):
+        """
+        Use a precomputed interpolation matrix for the prepared meshes,
+        it is only handed to the ``MEDCouplingRemapper`` when needed
+        """
+        self._matrix = matrix
+        self._denominators = {}
+        self._mapper_ready = False
+        self._reverse = None
+
+    def _remapper(self):
+        """
+        Prepared ``MEDCouplingRemapper``
+        """
+        with self._lock:
+            if not self._mapper_ready:
+                # Medcoupling only takes double precision weights
+                matrix = self._matrix.astype(np.float64, copy=False)
+                if matrix.nnz == 0:
+                    # Medcoupling rejects the zero strides of empty numpy arrays,
+                    # arrays of one element are used with no stored entry
+                    import scipy.sparse
+
+                    matrix = scipy.sparse.csr_matrix(
+                        (
+                            np.zeros(1),
+                            np.zeros(1, dtype=matrix.indices.dtype),
+                            np.zeros(matrix.shape[0] + 1, dtype=matrix.indptr.dtype),
+                        ),
+                        shape=matrix.shape,
+                    )
+                self._mapper.setCrudeMatrix(
+                    self.mesh_source_mc, self.mesh_target_mc, self.method, matrix
+                )
+                self._mapper_ready = True
+            return self._mapper
 
     def transfer(self, field_name, nature="IntensiveMaximum", default_value=np.nan):
         """
@@ -288,24 +1588,668 @@ class Mapper:
             nature (str): Physical nature of the field (``IntensiveMaximum``, ``IntensiveConservation``, ``ExtensiveMaximum`` or ``ExtensiveConservation``)
             default_value (float): Default value when mapping is not possible
         """
+        with self._lock:
+            self._print("Transfering...")
+            if self.method[:2] == "P1":
+                on = "points"
+            else:
+                on = "cells"
+            mesh_source_mc = self.mesh_source_mc
+            with self.stats.stage("field_mc_from_meshio", field=field_name, on=on):
+                self.field_source = field_mc_from_meshio(
+                    self.mesh_source,
+                    field_name,
+                    on=on,
+                    mesh_mc=mesh_source_mc,
+                    nature=nature,
+                    cell_offsets=(
+                        self._cell_offsets("source") if on == "cells" else None
+                    ),
+                )
+            remapper = self._remapper()
+            with self.stats.stage("transferField", field=field_name, nature=nature):
+                self.field_target = remapper.transferField(
+                    self.field_source, dftValue=default_value
+                )
+            self.field_target.setName(field_name)
+            return MappingResult(
+                self.field_target,
+                self.mesh_target,
+                self.stats,
+                self._cell_offsets("target") if self.method[2:] == "P0" else None,
+            )
+
+    def transfer_many(self, fields, nature="IntensiveMaximum", default_value=np.nan):
+        """
+        Transfer several fields from the source mesh to the target mesh at once,
+        after :py:meth:`~.Mapper.prepare`.
+
+        All fields, components and time steps are stacked as columns of a
+        single 2D array, to which the interpolation matrix is applied in
+        one sparse matrix product.
+
+        Args:
+            fields (list or dict): Names of the fields defined in the source mesh,
+                                   or ``dict`` mapping names to source arrays.
+                                   Point arrays have one row per source point, cell
+                                   arrays are given as in ``mesh.cell_data``. Trailing
+                                   dimensions (components, time steps...) are mapped
+                                   independently.
+            nature (str or dict): Physical nature of the fields, possibly per field
+            default_value (float or dict): Default value when mapping is not possible,
+                                           possibly per field
+
+        Returns:
+            MappingResults: Mapped fields
+        """
         self._print("Transfering...")
-        if self.method[:2] == "P1":
-            on = "points"
+        if not isinstance(fields, dict):
+            fields = {name: None for name in fields}
+        with self.stats.stage("transfer_many", nfields=len(fields)) as counts:
+            res = self._transfer_many(
+                self._state(fields, nature), fields, default_value
+            )
+            counts["ncols"] = res.block.shape[1]
+        return res
+
+    def prepare_future(
+        self,
+        mesh_source,
+        mesh_target,
+        method="P1P0",
+        intersection_type=None,
+        crop=True,
+        executor=None,
+    ):
+        """
+        Run :py:meth:`~.Mapper.prepare` in the background: the interpolation matrix
+        is computed in an executor, by default a process pool shared by all mappers,
+        so that several preparations run in parallel
+
+        Args:
+            mesh_source (meshio mesh): Source mesh
+            mesh_target (meshio mesh): Target mesh
+            method (str): Mapping methods: ``P1P0``, ``P1P1``, ``P0P0`` or ``P0P1``
+            intersection_type (str): Intersection algorithm depending on meshes and the method
+            crop (bool): Whether to discard the source cells far from the target mesh
+            executor (concurrent.futures.Executor): Executor computing the matrix
+
+        Returns:
+            concurrent.futures.Future: Resolved to the mapper once it is prepared
+        """
+        from concurrent.futures import Future
+
+        if executor is None:
+            executor = _default_executor("process")
+        # The mapper keeps its current preparation until the matrix is computed:
+        # the options of the new one are those of a copy of its remapper
+        options = {}
+        if self.backend != "numpy":
+            remapper = mc.MEDCouplingRemapper()
+            with self._lock:
+                for name, value in _remapper_options(self._mapper).items():
+                    getattr(remapper, "set" + name)(value)
+            _set_intersection_type(remapper, method, intersection_type)
+            options = _remapper_options(remapper)
+        future_matrix = executor.submit(
+            _prepare_worker,
+            mesh_source,
+            mesh_target,
+            method,
+            intersection_type,
+            options,
+            crop,
+            self.backend,
+            self.cache,
+        )
+
+        future = Future()
+
+        def finish(future_matrix):
+            try:
+                matrix = future_matrix.result()
+                self.prepare(
+                    mesh_source, mesh_target, method, intersection_type, matrix=matrix
+                )
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(self)
+
+        # Meshes are set up in a thread, not in the callback run by the thread
+        # managing the executor, which would delay its other futures
+        future_matrix.add_done_callback(
+            lambda future_matrix: _default_executor("thread").submit(
+                finish, future_matrix
+            )
+        )
+        return future
+
+    def transfer_future(
+        self, fields, nature="IntensiveMaximum", default_value=np.nan, executor=None
+    ):
+        """
+        Run :py:meth:`~.Mapper.transfer_many` in the background, by default in
+        a thread pool shared by all mappers: sparse matrix products release the
+        GIL, so that transfers of several mappings, or of the same one, run
+        in parallel
+
+        Args:
+            fields (list or dict): Fields, see :py:meth:`~.Mapper.transfer_many`
+            nature (str or dict): Physical nature of the fields, possibly per field
+            default_value (float or dict): Default value when mapping is not possible,
+                                           possibly per field
+            executor (concurrent.futures.Executor): Thread pool running the transfer
+
+        Returns:
+            concurrent.futures.Future: Resolved to the :py:class:`~.MappingResults`
+        """
+        if executor is None:
+            executor = _default_executor("thread")
+        return executor.submit(self.transfer_many, fields, nature, default_value)
+
+    async def prepare_async(self, *args, **kwargs):
+        """
+        Coroutine running :py:meth:`~.Mapper.prepare_future`, so that several
+        mappings are awaited at once, e.g. with ``asyncio.gather``
+
+        Returns:
+            Mapper: This mapper, once prepared
+        """
+        import asyncio
+
+        return await asyncio.wrap_future(self.prepare_future(*args, **kwargs))
+
+    async def transfer_async(self, *args, **kwargs):
+        """
+        Coroutine running :py:meth:`~.Mapper.transfer_future`
+
+        Returns:
+            MappingResults: Mapped fields
+        """
+        import asyncio
+
+        return await asyncio.wrap_future(self.transfer_future(*args, **kwargs))
+
+    def transfer_to(
+        self,
+        writer,
+        fields,
+        nature="IntensiveMaximum",
+        default_value=np.nan,
+        step=None,
+        chunk_rows=65536,
+    ):
+        """
+        Transfer several fields as :py:meth:`~.Mapper.transfer_many`, writing
+        the mapped fields block of rows after block of rows to a file instead
+        of returning them, so that they are never held in memory as a whole
+
+        Args:
+            writer (FieldWriter or str): Writer of the mapped fields, or a file
+                                         to which they are appended, see
+                                         :py:class:`~.FieldWriter`
+            fields (list or dict): Fields, see :py:meth:`~.Mapper.transfer_many`
+            nature (str or dict): Physical nature of the fields, possibly per field
+            default_value (float or dict): Default value when mapping is not possible,
+                                           possibly per field
+            step (int): Time step, by default a new one appended to the file
+            chunk_rows (int): Number of target rows mapped at once
+
+        Returns:
+            int: Time step written
+        """
+        from .output import FieldWriter
+
+        if not isinstance(writer, FieldWriter):
+            with FieldWriter(writer) as writer:
+                return self.transfer_to(
+                    writer, fields, nature, default_value, step, chunk_rows
+                )
+
+        self._print("Transfering...")
+        if not isinstance(fields, dict):
+            fields = {name: None for name in fields}
+        with self.stats.stage("transfer_to", nfields=len(fields)) as counts:
+            state = self._state(fields, nature)
+            block_source, columns, cols_nature = self._source_block(
+                state, fields, nature
+            )
+            counts["ncols"] = block_source.shape[1]
+
+            nrows = state["matrix"].shape[0]
+            specs = {
+                name: (shape, block_source.dtype)
+                for name, (_, shape) in columns.items()
+            }
+            step, views = writer._reserve(specs, nrows, step)
+            for start in range(0, nrows, chunk_rows):
+                rows = slice(start, min(start + chunk_rows, nrows))
+                block = self._target_block(
+                    state, block_source, columns, cols_nature, default_value, rows
+                )
+                for name, (cols, shape) in columns.items():
+                    views[name][rows] = block[:, cols].reshape((len(block),) + shape)
+        return step
+
+    def _state(self, fields, nature):
+        """
+        Prepared mapping used by a transfer, read at once so that a preparation
+        or an update run meanwhile does not mix the previous and new mappings
+
+        Args:
+            fields (dict): Fields to transfer
+            nature (str or dict): Physical nature of the fields, possibly per field
+
+        Returns:
+            dict: Method, meshes, interpolation matrix, cell offsets of the meshes
+                  (for cell fields) and denominators of the natures of the fields
+        """
+        natures = {
+            nature[name] if isinstance(nature, dict) else nature for name in fields
+        }
+        with self._lock:
+            state = {
+                "method": self.method,
+                "mesh_source": self.mesh_source,
+                "mesh_target": self.mesh_target,
+                "matrix": self._crude_matrix(),
+                "nature": nature,
+                "offsets_source": None,
+                "offsets_target": None,
+                "denominators": {},
+            }
+            if self.method[:2] == "P0":
+                state["offsets_source"] = self._cell_offsets("source")
+            if self.method[2:] == "P0":
+                state["offsets_target"] = self._cell_offsets("target")
+            # Invalid natures of P1 fields are reported by _source_block
+            for nature_field in natures:
+                if "P1" not in self.method or nature_field == "IntensiveMaximum":
+                    state["denominators"][nature_field] = self._denominator(
+                        nature_field
+                    )
+        return state
+
+    def _transfer_many(self, state, fields, default_value):
+        on = "points" if state["method"][:2] == "P1" else "cells"
+        block_source, columns, cols_nature = self._source_block(
+            state, fields, state["nature"]
+        )
+        block = self._target_block(
+            state, block_source, columns, cols_nature, default_value
+        )
+        return MappingResults(
+            block,
+            columns,
+            on,
+            state["mesh_target"],
+            self.stats,
+            state["offsets_target"],
+        )
+
+    def _source_block(self, state, fields, nature):
+        """
+        Source values of fields stacked as columns of a single 2D array,
+        normalized according to their nature
+
+        Args:
+            state (dict): Prepared mapping, see :py:meth:`~.Mapper._state`
+            fields (dict): Fields to transfer
+            nature (str or dict): Physical nature of the fields, possibly per field
+
+        Returns:
+            tuple: Source block, column slice and component shape of each field,
+                   and columns of each nature
+        """
+        matrix = state["matrix"]
+        method = state["method"]
+        mesh_source = state["mesh_source"]
+
+        # Source arrays given per block of cells for cell fields, and the rows
+        # of each block in the source block
+        arrays = {}
+        for name, values in fields.items():
+            if method[:2] == "P1":
+                if values is None:
+                    assert name in mesh_source.point_data
+                    values = mesh_source.point_data[name]
+                arrays[name] = [np.asarray(values)]
+            else:
+                if values is None:
+                    assert name in mesh_source.cell_data
+                    values = mesh_source.cell_data[name]
+                assert len(values) == len(mesh_source.cells)
+                arrays[name] = [np.asarray(values_block) for values_block in values]
+        if method[:2] == "P1":
+            offsets = [(0, matrix.shape[1])]
         else:
-            on = "cells"
-        self.field_source = field_mc_from_meshio(
-            self.mesh_source,
-            field_name,
-            on=on,
-            mesh_mc=self.mesh_source_mc,
-            nature=nature,
+            offsets = state["offsets_source"]
+
+        # Stack all columns in a single block, trailing dimensions being flattened
+        columns = {}
+        ncols = 0
+        for name, values in arrays.items():
+            shape = values[0].shape[1:]
+            ncols_field = int(np.prod(shape, dtype=int))
+            columns[name] = (slice(ncols, ncols + ncols_field), shape)
+            ncols += ncols_field
+        # Single precision fields are mapped in single precision with a compact
+        # matrix, see compact()
+        dtype = np.result_type(
+            matrix.dtype, *(values[0].dtype for values in arrays.values())
         )
-        self.field_target = self._mapper.transferField(
-            self.field_source, dftValue=default_value
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.float64
+        block_source = np.empty((matrix.shape[1], ncols), dtype=dtype)
+        for name, values in arrays.items():
+            cols = columns[name][0]
+            for (begin, end), values_block in zip(offsets, values):
+                assert len(values_block) == end - begin
+                block_source[begin:end, cols] = values_block.reshape(end - begin, -1)
+
+        # Group columns by nature
+        cols_nature = {}
+        for name in columns:
+            nature_field = nature[name] if isinstance(nature, dict) else nature
+            if "P1" in method and nature_field != "IntensiveMaximum":
+                raise ValueError(
+                    "Invalid nature {} for P1 field {}: expected IntensiveMaximum".format(
+                        nature_field, name
+                    )
+                )
+            cols = np.arange(ncols)[columns[name][0]]
+            cols_nature.setdefault(nature_field, []).append(cols)
+        cols_nature = {k: np.concatenate(v) for k, v in cols_nature.items()}
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for nature_field, cols in cols_nature.items():
+                axis, deno = state["denominators"][nature_field]
+                if axis == 1:
+                    block_source[:, cols] /= deno[:, None]
+        return block_source, columns, cols_nature
+
+    def _target_block(
+        self, state, block_source, columns, cols_nature, default_value, rows=slice(None)
+    ):
+        """
+        Mapped values of a range of target rows from the source block
+        """
+        matrix = state["matrix"]
+        if rows != slice(None):
+            matrix = matrix[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            block = matrix @ block_source
+            for nature_field, cols in cols_nature.items():
+                axis, deno = state["denominators"][nature_field]
+                if axis == 0:
+                    block[:, cols] /= deno[rows, None]
+
+        # Target discretization points out of the source mesh
+        empty = np.diff(matrix.indptr) == 0
+        if np.any(empty):
+            for name in columns:
+                dft = default_value
+                if isinstance(default_value, dict):
+                    dft = default_value[name]
+                block[empty, columns[name][0]] = dft
+        return block
+
+    def _crude_matrix(self):
+        """
+        Prepared interpolation matrix as a ``scipy.sparse.csr_matrix``
+        """
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = self._mapper.getCrudeCSRMatrix()
+            return self._matrix
+
+    def _denominator(self, nature):
+        """
+        Normalization of the interpolation matrix for a given field nature,
+        following ``MEDCouplingRemapper``
+
+        Returns:
+            tuple: Axis (``0`` to divide the rows, ``1`` to divide the columns)
+                   and the denominators
+        """
+        with self._lock:
+            if nature in self._denominators:
+                return self._denominators[nature]
+
+            matrix = self._crude_matrix()
+            if nature == "IntensiveMaximum":
+                deno = (0, np.asarray(matrix.sum(axis=1)).ravel())
+            elif nature == "IntensiveConservation":
+                on = mc.ON_NODES if self.method[2:] == "P1" else mc.ON_CELLS
+                deno = (0, self._measure(on, self.mesh_target_mc))
+            elif nature == "ExtensiveMaximum":
+                on = mc.ON_NODES if self.method[:2] == "P1" else mc.ON_CELLS
+                deno = (1, self._measure(on, self.mesh_source_mc))
+            elif nature == "ExtensiveConservation":
+                deno = (1, np.asarray(matrix.sum(axis=0)).ravel())
+            else:
+                raise ValueError("Unknown field nature {}".format(nature))
+            self._denominators[nature] = deno
+            return deno
+
+    def _measure(self, on, mesh_mc):
+        field = mc.MEDCouplingFieldDouble(on, mc.NO_TIME)
+        measure = field.getDiscretization().getMeasureField(
+            mesh_mc, self._mapper.getMeasureAbsStatus()
         )
-        self.field_target.setName(field_name)
-        return MappingResult(self.field_target, self.mesh_target)
+        return measure.getArray().toNumPyArray()
 
     def _print(self, blabla):
         if self.verbose:
             print(blabla)
+
+
+def prepare_many(
+    mesh_source,
+    meshes_target,
+    method="P1P0",
+    intersection_type=None,
+    workers=1,
+    verbose=False,
+):
+    """
+    Prepare field mappings from one source mesh to several target meshes.
+
+    The source mesh is cleaned up, converted to medcoupling and the bounding
+    boxes of its cells are computed once. Each target mesh is then prepared
+    against the source cells close to it, possibly in a process pool. The
+    returned mappers share the source mesh and its medcoupling mesh.
+
+    Args:
+        mesh_source (meshio mesh): Source mesh
+        meshes_target (list): Target meshes
+        method (str): Mapping methods: ``P1P0``, ``P1P1``, ``P0P0`` or ``P0P1``
+        intersection_type (str): Intersection algorithm depending on meshes and the method
+        workers (int): Number of processes preparing the target meshes
+        verbose (bool): Whehter print out progress information
+
+    Returns:
+        list: Prepared :py:class:`~.Mapper` of each target mesh
+    """
+    cleanup_mesh_meshio(mesh_source)
+    mesh_source_mc = mesh_mc_from_meshio(mesh_source)
+
+    mappers = []
+    tasks = []
+    for mesh_target in meshes_target:
+        mapper = Mapper(verbose=verbose)
+        mapper._set_method(method, intersection_type)
+        mapper.mesh_source = mesh_source
+        mapper.mesh_source_mc = mesh_source_mc
+        if len(mappers) > 0:
+            mapper._source_boxes = mappers[0]._source_boxes
+
+        mapper._print("Loading target mesh...")
+        with mapper.stats.stage("cleanup_mesh_meshio", mesh="target"):
+            cleanup_mesh_meshio(mesh_target)
+        mapper.mesh_target = mesh_target
+        mapper.mesh_target_mc = None
+
+        owned = np.ones(mapper._matrix_shape()[0], dtype=bool)
+        tasks.append(mapper._rows_task(owned, *mapper._source_bounding_boxes()))
+        mappers.append(mapper)
+
+    # Interpolation matrices on the submeshes
+    args = [task[2:] for task in tasks if task is not None]
+    if workers > 1 and len(args) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            matrices = iter(list(executor.map(_prepare_matrix, *zip(*args))))
+    else:
+        matrices = (_prepare_matrix(*arg) for arg in args)
+
+    for mapper, task in zip(mappers, tasks):
+        mapper._print("Preparing...")
+        with mapper.stats.stage("prepare", method=method, workers=workers) as counts:
+            entries = []
+            if task is not None:
+                owned = np.ones(mapper._matrix_shape()[0], dtype=bool)
+                entries.append(_owned_entries(next(matrices), *task[:2], owned))
+            matrix = _assemble_matrix(entries, mapper._matrix_shape())
+            counts["nnz"] = matrix.nnz
+        mapper._set_matrix(matrix)
+    return mappers
+
+
+def prepare_hierarchy(
+    mesh_source,
+    meshes_target,
+    method="P1P0",
+    intersection_type=None,
+    verbose=False,
+):
+    """
+    Prepare field mappings from one source mesh to a hierarchy of nested target
+    meshes, such as the uniform refinements of a coarse mesh in a convergence study.
+
+    The coarsest target mesh is prepared first. The finer target meshes being
+    covered by its cells, only the source cells found by this coarse preparation
+    are candidates for them: all finer target meshes are then prepared at once
+    against these source cells, so that medcoupling builds their search tree once
+    for the whole hierarchy instead of once per target mesh. The returned mappers
+    share the source mesh and its medcoupling mesh.
+
+    Args:
+        mesh_source (meshio mesh): Source mesh
+        meshes_target (list): Target meshes from the coarsest to the finest,
+                              all of them covered by the cells of the first one
+        method (str): Mapping methods: ``P1P0``, ``P1P1``, ``P0P0`` or ``P0P1``
+        intersection_type (str): Intersection algorithm depending on meshes and the method
+        verbose (bool): Whehter print out progress information
+
+    Returns:
+        list: Prepared :py:class:`~.Mapper` of each target mesh
+    """
+    cleanup_mesh_meshio(mesh_source)
+    mesh_source_mc = mesh_mc_from_meshio(mesh_source)
+
+    mappers = []
+    for mesh_target in meshes_target:
+        mapper = Mapper(verbose=verbose)
+        mapper._set_method(method, intersection_type)
+        mapper.mesh_source = mesh_source
+        mapper.mesh_source_mc = mesh_source_mc
+
+        mapper._print("Loading target mesh...")
+        with mapper.stats.stage("cleanup_mesh_meshio", mesh="target"):
+            cleanup_mesh_meshio(mesh_target)
+        mapper.mesh_target = mesh_target
+        mapper.mesh_target_mc = None
+        mappers.append(mapper)
+    if len(mappers) == 0:
+        return mappers
+
+    coarse = mappers[0]
+    coarse._print("Preparing...")
+    with coarse.stats.stage("prepare", method=method) as counts:
+        matrix = coarse._prepare_matrix(method, 1, True)
+        if matrix is not None:
+            coarse._set_matrix(matrix)
+        counts["nnz"] = coarse._crude_matrix().nnz
+    if len(mappers) == 1:
+        return mappers
+
+    # Candidate source cells of the finer target meshes, covered by the coarse one:
+    # the source cells intersecting the coarse cells according to its interpolation
+    # matrix, or whose bounding boxes intersect the coarse mesh for point locators
+    with coarse.stats.stage("prepare_hierarchy", levels=len(mappers) - 1) as counts:
+        if coarse._mapper.getIntersectionType() != mc.PointLocator:
+            matrix = coarse._crude_matrix()
+            used = np.zeros(matrix.shape[1], dtype=bool)
+            used[matrix.indices] = True
+            if method[:2] == "P1":
+                cell_ids = cells_touching(mesh_source, used)
+            else:
+                cell_ids = np.flatnonzero(used)
+        else:
+            points = coarse.mesh_target.points.reshape(
+                len(coarse.mesh_target.points), -1
+            )
+            cell_ids = cells_in_box(
+                *coarse._source_bounding_boxes(),
+                points.min(axis=0),
+                points.max(axis=0),
+                coarse._mapper.getBoundingBoxAdjustment(),
+                coarse._mapper.getBoundingBoxAdjustmentAbs(),
+            )
+        counts["ncells_source"] = len(cell_ids)
+        if len(cell_ids) > 0:
+            mesh_source_sub, point_ids = extract_cells(mesh_source, cell_ids)
+            cols = point_ids if method[:2] == "P1" else cell_ids
+            mesh_target, rows = _stack_meshes(
+                [mapper.mesh_target for mapper in mappers[1:]],
+                "points" if method[2:] == "P1" else "cells",
+            )
+            matrix = _prepare_matrix(
+                mesh_source_sub, mesh_target, method, _remapper_options(coarse._mapper)
+            ).tocsr()
+
+    for k, mapper in enumerate(mappers[1:]):
+        with mapper.stats.stage("prepare", method=method) as counts:
+            shape = mapper._matrix_shape()
+            if len(cell_ids) > 0:
+                matrix_level = _expand_matrix(matrix[rows[k]], shape, cols=cols)
+            else:
+                matrix_level = _assemble_matrix([], shape)
+            counts["nnz"] = matrix_level.nnz
+        mapper._set_matrix(matrix_level)
+    return mappers
+
+
+def _stack_meshes(meshes, on):
+    """
+    Disjoint union of meshes, with the indices of the points (``on="points"``)
+    or the cells (``on="cells"``) of each mesh in the union
+    """
+    points = [mesh.points.reshape(len(mesh.points), -1) for mesh in meshes]
+    assert len({p.shape[1] for p in points}) == 1
+    begins = np.cumsum([0] + [len(p) for p in points])
+    cells = [
+        (cells.type, cells.data + begin)
+        for mesh, begin in zip(meshes, begins)
+        for cells in mesh.cells
+    ]
+    mesh = meshio.Mesh(np.concatenate(points), cells)
+    if on == "points":
+        return mesh, [np.arange(begins[k], begins[k + 1]) for k in range(len(meshes))]
+
+    # Cells of each mesh in its own ordering, see block_order
+    offsets = block_offsets(mesh)
+    rows = []
+    first = 0
+    for mesh_k in meshes:
+        rows.append(
+            np.concatenate(
+                [np.arange(*offsets[first + j]) for j in block_order(mesh_k)]
+                + [np.empty(0, dtype=int)]
+            )
+        )
+        first += len(mesh_k.cells)
+    return mesh, rows
@@ -0,0 +1,300 @@
+import struct
+
+import numpy as np
+
+from .main import MappingResult, MappingResults
+
+# Spaces reserved in the header of .npy files, so that it can be rewritten in place
+# when time steps are appended
+_npy_reserve = 64
+
+
+class FieldWriter:
+    """
+    Writer of mapped fields to a file, written in place as they are produced
+    without a copy of the target mesh.
+
+    Each field is stored as an array of shape ``(nsteps, nrows, *components)``,
+    one time step after the other, so that downstream tools read slices
+    (time steps, rows) without loading the whole file, see :py:func:`read_field`.
+
+    * ``.npy`` files hold a structured array with one record per time step and
+      one named field per mapped field, written through a memory map. Fields are
+      fixed when the file is created.
+    * ``.h5`` or ``.hdf5`` files hold one chunked dataset per field. Fields may be
+      added at any time.
+
+    Values of fields not written at some time step are ``nan``.
+
+    Args:
+        filename (str): ``.npy``, ``.h5`` or ``.hdf5`` file
+        mode (str): ``w`` to create a new file, ``a`` to append to an existing file
+                    (created if it does not exist)
+        chunk_rows (int): Number of rows of the chunks of HDF5 datasets
+        compression (str): Compression filter of HDF5 datasets, e.g. ``gzip``
+    """
+
+    def __init__(self, filename, mode="a", chunk_rows=65536, compression=None):
+        assert mode in ["w", "a"]
+        if filename.endswith(".npy"):
+            self.format = "npy"
+        elif filename.endswith(".h5") or filename.endswith(".hdf5"):
+            self.format = "hdf5"
+        else:
+            raise ValueError(
+                "Unsupported output file {}: expected .npy, .h5 or .hdf5".format(
+                    filename
+                )
+            )
+        self.filename = filename
+        self.chunk_rows = chunk_rows
+        self.compression = compression
+
+        self._memmap = None
+        if self.format == "hdf5":
+            import h5py
+
+            self._file = h5py.File(filename, mode)
+        else:
+            try:
+                self._file = open(filename, "r+b" if mode == "a" else "w+b")
+            except FileNotFoundError:
+                self._file = open(filename, "x+b")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self._memmap is not None:
+            self._memmap.flush()
+            self._memmap = None
+        self._file.close()
+
+    @property
+    def fields(self):
+        """
+        Names of the fields of the file
+        """
+        if self.format == "hdf5":
+            return list(self._file)
+        dtype, _, _ = self._npy_header()
+        return [] if dtype is None else list(dtype.names)
+
+    @property
+    def nsteps(self):
+        """
+        Number of time steps of the file
+        """
+        if self.format == "hdf5":
+            return max((len(dataset) for dataset in self._file.values()), default=0)
+        _, shape, _ = self._npy_header()
+        return 0 if shape is None else shape[0]
+
+    def write(self, fields, step=None):
+        """
+        Write mapped fields at a time step
+
+        Args:
+            fields (MappingResult, MappingResults or dict): Mapped fields, or ``dict``
+                                                            mapping names to arrays
+            step (int): Time step, by default a new one appended to the file
+
+        Returns:
+            int: Time step written
+        """
+        if isinstance(fields, MappingResult):
+            fields = {fields.field_target.getName(): fields.array()}
+        elif isinstance(fields, MappingResults):
+            fields = {name: fields.array(name) for name in fields}
+
+        arrays = {name: np.asarray(array) for name, array in fields.items()}
+        nrows = {len(array) for array in arrays.values()}
+        if len(nrows) != 1:
+            raise ValueError("All fields must have the same number of rows")
+        specs = {name: (array.shape[1:], array.dtype) for name, array in arrays.items()}
+
+        step, views = self._reserve(specs, nrows.pop(), step)
+        for name, array in arrays.items():
+            views[name][:] = array
+        return step
+
+    def _reserve(self, specs, nrows, step=None):
+        """
+        Time step of fields, created if needed
+
+        Args:
+            specs (dict): Component shape and ``dtype`` of each field
+            nrows (int): Number of rows of the fields
+            step (int): Time step, by default a new one appended to the file
+
+        Returns:
+            tuple: Time step and, for each field, a view of its rows at this step
+                   to which values are assigned
+        """
+        if step is None:
+            step = self.nsteps
+        if self.format == "hdf5":
+            return step, self._reserve_hdf5(specs, nrows, step)
+        return step, self._reserve_npy(specs, nrows, step)
+
+    def _reserve_hdf5(self, specs, nrows, step):
+        views = {}
+        for name, (shape, dtype) in specs.items():
+            if name not in self._file:
+                fillvalue = np.nan if np.issubdtype(dtype, np.inexact) else 0
+                self._file.create_dataset(
+                    name,
+                    shape=(0, nrows) + shape,
+                    maxshape=(None, nrows) + shape,
+                    chunks=(1, max(1, min(nrows, self.chunk_rows))) + shape,
+                    dtype=dtype,
+                    fillvalue=fillvalue,
+                    compression=self.compression,
+                )
+            dataset = self._file[name]
+            if dataset.shape[1:] != (nrows,) + shape:
+                raise ValueError(
+                    "Shape {} of field {} does not match the file: {}".format(
+                        (nrows,) + shape, name, dataset.shape[1:]
+                    )
+                )
+            views[name] = _DatasetStep(dataset, step)
+
+        # All fields share the time steps, unwritten values being nan
+        for dataset in self._file.values():
+            if len(dataset) <= step:
+                dataset.resize(step + 1, axis=0)
+        return views
+
+    def _reserve_npy(self, specs, nrows, step):
+        dtype, shape, offset = self._npy_header()
+        if dtype is None:
+            dtype = np.dtype(
+                [
+                    (name, dtype_field, shape_field)
+                    for name, (shape_field, dtype_field) in specs.items()
+                ]
+            )
+            shape = (0, nrows)
+            offset = self._write_npy_header(dtype, shape)
+        for name, (shape_field, dtype_field) in specs.items():
+            if name not in dtype.names:
+                raise ValueError(
+                    "Field {} is not in {}: the fields of .npy files "
+                    "are fixed when they are created".format(name, self.filename)
+                )
+            if dtype[name].shape != shape_field or shape[1] != nrows:
+                raise ValueError(
+                    "Shape {} of field {} does not match the file".format(
+                        (nrows,) + shape_field, name
+                    )
+                )
+
+        # Grow the file by whole time steps, unwritten values being nan
+        if shape[0] <= step:
+            nsteps_old = shape[0]
+            shape = (step + 1, nrows)
+            self._write_npy_header(dtype, shape, offset)
+            self._file.truncate(offset + int(np.prod(shape)) * dtype.itemsize)
+            self._memmap = None
+            memmap = self._open_memmap(dtype, shape, offset)
+            for name in dtype.names:
+                if np.issubdtype(dtype[name].base, np.inexact):
+                    memmap[name][nsteps_old:] = np.nan
+        memmap = self._open_memmap(dtype, shape, offset)
+        return {name: memmap[name][step] for name in specs}
+
+    def _open_memmap(self, dtype, shape, offset):
+        if self._memmap is None or self._memmap.shape != shape:
+            self._file.flush()
+            self._memmap = np.memmap(
+                self._file, dtype=dtype, mode="r+", shape=shape, offset=offset
+            )
+        return self._memmap
+
+    def _npy_header(self):
+        """
+        ``dtype``, shape and data offset of the .npy file,
+        ``None`` if the file is empty
+        """
+        self._file.seek(0)
+        if len(self._file.read(1)) == 0:
+            return None, None, None
+        self._file.seek(0)
+        if np.lib.format.read_magic(self._file) == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(self._file)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(self._file)
+        return dtype, shape, self._file.tell()
+
+    def _write_npy_header(self, dtype, shape, offset=None):
+        """
+        Write the header of the .npy file, in place of the current one
+        if its data offset is given
+
+        Returns:
+            int: Data offset
+        """
+        header = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(
+            np.lib.format.dtype_to_descr(dtype), shape
+        )
+        if offset is None:
+            # Version 2.0 for the long headers of many fields
+            version = (1, 0) if len(header) + _npy_reserve < 65000 else (2, 0)
+            prefix_size = 10 if version == (1, 0) else 12
+            offset = prefix_size + len(header) + _npy_reserve + 1
+            offset += -offset % 64
+        else:
+            self._file.seek(0)
+            version = np.lib.format.read_magic(self._file)
+            prefix_size = 10 if version == (1, 0) else 12
+        header_size = offset - prefix_size
+        if len(header) + 1 > header_size:
+            raise ValueError("Too many time steps for the header of .npy files")
+
+        self._file.seek(0)
+        self._file.write(np.lib.format.magic(*version))
+        self._file.write(struct.pack("<H" if version == (1, 0) else "<I", header_size))
+        self._file.write(header.ljust(header_size - 1).encode("latin1") + b"\n")
+        self._file.flush()
+        return offset
+
+
+class _DatasetStep:
+    """
+    Rows of an HDF5 dataset at a time step
+    """
+
+    def __init__(self, dataset, step):
+        self.dataset = dataset
+        self.step = step
+
+    def __setitem__(self, rows, values):
+        self.dataset[self.step, rows] = values
+
+
+def read_field(filename, field_name, steps=slice(None), rows=slice(None)):
+    """
+    Read a slice of a field written by :py:class:`FieldWriter`, without loading
+    the rest of the file
+
+    Args:
+        filename (str): ``.npy``, ``.h5`` or ``.hdf5`` file
+        field_name (str): Name of the field
+        steps (int, slice or list): Time steps to read
+        rows (int, slice or list): Rows to read
+
+    Returns:
+        numpy array: Values of the field
+    """
+    if filename.endswith(".npy"):
+        memmap = np.load(filename, mmap_mode="r")
+        return np.array(memmap[field_name][steps, rows])
+
+    import h5py
+
+    with h5py.File(filename, "r") as f:
+        return f[field_name][steps, rows]
@@ -0,0 +1,481 @@
+import meshio
+import numpy as np
+
+
+def block_order(mesh):
+    """
+    Indices of the cell blocks of a meshio mesh grouped by celltype, in the
+    order of ``mesh.cells_dict``, which is also the cell ordering of the
+    medcoupling mesh
+    """
+    celltypes = dict.fromkeys(cells.type for cells in mesh.cells)
+    return [
+        k
+        for celltype in celltypes
+        for k, cells in enumerate(mesh.cells)
+        if cells.type == celltype
+    ]
+
+
+def block_offsets(mesh):
+    """
+    Range of the cells of each block of ``mesh.cells`` in the cell ordering
+    of the medcoupling mesh, see :py:func:`block_order`
+
+    Returns:
+        numpy array: First and past-the-end cell indices of each block,
+                     of shape ``(len(mesh.cells), 2)``
+    """
+    order = block_order(mesh)
+    sizes = np.array([len(mesh.cells[k].data) for k in order], dtype=int)
+    offsets = np.empty((len(order), 2), dtype=int)
+    offsets[order, 1] = np.cumsum(sizes)
+    offsets[order, 0] = offsets[order, 1] - sizes
+    return offsets
+
+
+def cell_blocks(mesh):
+    """
+    Cell blocks of a meshio mesh following :py:func:`block_order`
+
+    Returns:
+        list: ``(celltype, connectivity)`` of each non-empty block
+    """
+    return [
+        (mesh.cells[k].type, mesh.cells[k].data)
+        for k in block_order(mesh)
+        if len(mesh.cells[k].data) > 0
+    ]
+
+
+def _points(mesh):
+    return mesh.points.reshape(len(mesh.points), -1)
+
+
+def cell_bounding_boxes(mesh):
+    """
+    Bounding boxes of all cells of a meshio mesh
+
+    Returns:
+        tuple: Lower and upper corners of the boxes, of shape ``(ncells, dim)``
+    """
+    points = _points(mesh)
+    lower = []
+    upper = []
+    for _, data in cell_blocks(mesh):
+        # Reducing over the vertices column by column is much faster than
+        # a reduction along the short middle axis of ``points[data]``
+        lower_block = points[data[:, 0]]
+        upper_block = lower_block.copy()
+        for j in range(1, data.shape[1]):
+            points_vertex = points[data[:, j]]
+            np.minimum(lower_block, points_vertex, out=lower_block)
+            np.maximum(upper_block, points_vertex, out=upper_block)
+        lower.append(lower_block)
+        upper.append(upper_block)
+    if len(lower) == 0:
+        return np.empty((0, points.shape[1])), np.empty((0, points.shape[1]))
+    return np.concatenate(lower), np.concatenate(upper)
+
+
+def cell_centroids(mesh):
+    """
+    Centroids (mean of the vertices) of all cells of a meshio mesh
+    """
+    points = _points(mesh)
+    centroids = [points[data].mean(axis=1) for _, data in cell_blocks(mesh)]
+    if len(centroids) == 0:
+        return np.empty((0, points.shape[1]))
+    return np.concatenate(centroids)
+
+
+def select_cells(mesh, selection):
+    """
+    Indices of the cells of a meshio mesh selected by a cell data tag,
+    indices or a predicate
+
+    Args:
+        mesh (meshio mesh): Mesh object
+        selection: Either ``(name, values)``: cells whose value of the cell data
+                   ``name`` (e.g. ``gmsh:physical``) is one of ``values``;
+                   indices or boolean mask of the cells, following the
+                   ordering of :py:func:`cell_blocks`; or a callable taking
+                   the centroids of the cells and returning a boolean mask
+
+    Returns:
+        numpy array: Sorted indices of the selected cells
+    """
+    ncells = sum(len(data) for _, data in cell_blocks(mesh))
+    if isinstance(selection, tuple) and isinstance(selection[0], str):
+        name, values = selection
+        tags = [
+            np.asarray(mesh.cell_data[name][k]).ravel()
+            for k in block_order(mesh)
+            if len(mesh.cells[k].data) > 0
+        ]
+        mask = np.isin(np.concatenate(tags) if len(tags) > 0 else [], values)
+    elif callable(selection):
+        mask = np.asarray(selection(cell_centroids(mesh)), dtype=bool)
+    else:
+        selection = np.asarray(selection)
+        if selection.dtype != bool:
+            return np.unique(selection)
+        mask = selection
+    assert len(mask) == ncells
+    return np.flatnonzero(mask)
+
+
+def extract_cells(mesh, cell_ids):
+    """
+    Extract a submesh made of some cells of a meshio mesh, with
+    renumbered points
+
+    Args:
+        mesh (meshio mesh): Mesh object
+        cell_ids (numpy array): Sorted indices of the cells to keep,
+                                following the ordering of :py:func:`cell_blocks`
+
+    Returns:
+        tuple: Submesh and indices in ``mesh`` of its points
+    """
+    blocks = cell_blocks(mesh)
+    offsets = np.cumsum([0] + [len(data) for _, data in blocks])
+    bounds = np.searchsorted(cell_ids, offsets)
+
+    point_mask = np.zeros(len(mesh.points), dtype=bool)
+    cells = []
+    for k, (celltype, data) in enumerate(blocks):
+        ids = cell_ids[bounds[k] : bounds[k + 1]] - offsets[k]
+        if len(ids) > 0:
+            data = data[ids]
+            point_mask[data] = True
+            cells.append((celltype, data))
+
+    point_ids = np.flatnonzero(point_mask)
+    renumbering = np.zeros(len(mesh.points), dtype=point_ids.dtype)
+    renumbering[point_ids] = np.arange(len(point_ids))
+    cells = [(celltype, renumbering[data]) for celltype, data in cells]
+    return meshio.Mesh(mesh.points[point_ids], cells), point_ids
+
+
+def cells_touching(mesh, point_mask):
+    """
+    Indices of the cells having at least one point in ``point_mask``
+    """
+    touching = [np.any(point_mask[data], axis=1) for _, data in cell_blocks(mesh)]
+    if len(touching) == 0:
+        return np.empty(0, dtype=int)
+    return np.flatnonzero(np.concatenate(touching))
+
+
+def points_of_cells(mesh, cell_mask):
+    """
+    Mask of the points belonging to at least one cell of ``cell_mask``
+    """
+    point_mask = np.zeros(len(mesh.points), dtype=bool)
+    begin = 0
+    for _, data in cell_blocks(mesh):
+        point_mask[data[cell_mask[begin : begin + len(data)]]] = True
+        begin += len(data)
+    return point_mask
+
+
+def match_rows(rows_old, rows_new):
+    """
+    Match identical rows of two arrays, e.g. point coordinates
+
+    Returns:
+        numpy array: Index in ``rows_old`` of each row of ``rows_new``,
+                     ``-1`` if it has no identical row
+    """
+    rows = np.concatenate([rows_old, rows_new]).reshape(
+        len(rows_old) + len(rows_new), -1
+    )
+    rows = np.ascontiguousarray(rows)
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    ids = first[inverse[len(rows_old) :]]
+    ids[ids >= len(rows_old)] = -1
+    return ids
+
+
+def match_cells(mesh_old, mesh_new):
+    """
+    Match the cells of two meshio meshes having the same type and the
+    same vertex coordinates, in the same order
+
+    Returns:
+        numpy array: Index in ``mesh_old`` of each cell of ``mesh_new``,
+                     ``-1`` if the cell is new or was moved
+    """
+    blocks_old = {}
+    begin = 0
+    for celltype, data in cell_blocks(mesh_old):
+        blocks_old.setdefault(celltype, []).append((begin, data))
+        begin += len(data)
+
+    ids = []
+    for celltype, data in cell_blocks(mesh_new):
+        ids_block = np.full(len(data), -1)
+        for begin_old, data_old in blocks_old.get(celltype, []):
+            unmatched = np.flatnonzero(ids_block < 0)
+            if len(unmatched) == 0:
+                break
+            ids_old = match_rows(
+                _points(mesh_old)[data_old].reshape(len(data_old), -1),
+                _points(mesh_new)[data[unmatched]].reshape(len(unmatched), -1),
+            )
+            found = ids_old >= 0
+            ids_block[unmatched[found]] = begin_old + ids_old[found]
+        ids.append(ids_block)
+    if len(ids) == 0:
+        return np.empty(0, dtype=int)
+    return np.concatenate(ids)
+
+
+def match_points(mesh_old, mesh_new, cell_ids):
+    """
+    Match the points of two meshio meshes having the same coordinates
+    and the same surrounding cells
+
+    Args:
+        mesh_old (meshio mesh): Old mesh
+        mesh_new (meshio mesh): New mesh
+        cell_ids (numpy array): Matching of the cells, see :py:func:`match_cells`
+
+    Returns:
+        numpy array: Index in ``mesh_old`` of each point of ``mesh_new``,
+                     ``-1`` if the point or one of its cells changed
+    """
+    point_ids = match_rows(_points(mesh_old), _points(mesh_new))
+
+    # Points of new or moved cells, and points of removed cells
+    changed = cell_ids < 0
+    removed = np.ones(sum(len(data) for _, data in cell_blocks(mesh_old)), dtype=bool)
+    removed[cell_ids[~changed]] = False
+    point_ids[points_of_cells(mesh_new, changed)] = -1
+    found = np.flatnonzero(point_ids >= 0)
+    point_ids[found[points_of_cells(mesh_old, removed)[point_ids[found]]]] = -1
+    return point_ids
+
+
+def boxes_intersecting(lower, upper, lower_other, upper_other):
+    """
+    Mask of the boxes intersecting at least one of other boxes
+
+    Args:
+        lower (numpy array): Lower corners of the boxes, of shape ``(nboxes, dim)``
+        upper (numpy array): Upper corners of the boxes
+        lower_other (numpy array): Lower corners of the other boxes
+        upper_other (numpy array): Upper corners of the other boxes
+    """
+    from scipy.spatial import cKDTree
+
+    mask = np.zeros(len(lower), dtype=bool)
+    if len(lower) == 0 or len(lower_other) == 0:
+        return mask
+
+    # Candidates from the distance between box centers, then exact tests
+    centers = (lower + upper) / 2
+    radius = np.linalg.norm(upper - lower, axis=1) / 2
+    centers_other = (lower_other + upper_other) / 2
+    radius_other = np.linalg.norm(upper_other - lower_other, axis=1) / 2
+    candidates = cKDTree(centers).query_ball_point(
+        centers_other, radius_other + radius.max()
+    )
+    counts = np.array([len(c) for c in candidates], dtype=int)
+    if counts.sum() == 0:
+        return mask
+    ids = np.concatenate(candidates).astype(int)
+    ids_other = np.repeat(np.arange(len(lower_other)), counts)
+    intersect = np.all(lower[ids] <= upper_other[ids_other], axis=1) & np.all(
+        upper[ids] >= lower_other[ids_other], axis=1
+    )
+    mask[ids[intersect]] = True
+    return mask
+
+
+def cells_in_box(
+    lower, upper, box_lower, box_upper, adjustment=0.0, adjustment_abs=0.0
+):
+    """
+    Indices of the cells whose bounding boxes intersect a given box
+
+    Args:
+        lower (numpy array): Lower corners of the cell bounding boxes
+        upper (numpy array): Upper corners of the cell bounding boxes
+        box_lower (numpy array): Lower corner of the box
+        box_upper (numpy array): Upper corner of the box
+        adjustment (float): Relative enlargement of the cell bounding boxes,
+                            as the ``BoundingBoxAdjustment`` option of medcoupling
+        adjustment_abs (float): Absolute enlargement of the cell bounding boxes,
+                                as the ``BoundingBoxAdjustmentAbs`` option of medcoupling
+    """
+    margin = adjustment * np.max(upper - lower, axis=1, initial=0) + adjustment_abs
+    intersect = np.all(lower - margin[:, None] <= box_upper, axis=1) & np.all(
+        upper + margin[:, None] >= box_lower, axis=1
+    )
+    return np.flatnonzero(intersect)
+
+
+def bisect(coords, nparts):
+    """
+    Partition points by recursive coordinate bisection
+
+    Args:
+        coords (numpy array): Coordinates of the points, of shape ``(npoints, dim)``
+        nparts (int): Number of parts
+
+    Returns:
+        numpy array: Part of each point
+    """
+    labels = np.zeros(len(coords), dtype=int)
+    stack = [(np.arange(len(coords)), 0, nparts)]
+    while len(stack) > 0:
+        ids, first, nparts_ids = stack.pop()
+        if nparts_ids == 1 or len(ids) == 0:
+            labels[ids] = first
+            continue
+
+        # Split along the largest extent, proportionally to the number of parts
+        coords_ids = coords[ids]
+        axis = np.argmax(np.ptp(coords_ids, axis=0))
+        nparts_left = nparts_ids // 2
+        nleft = len(ids) * nparts_left // nparts_ids
+        order = np.argpartition(coords_ids[:, axis], nleft)
+        stack.append((ids[order[:nleft]], first, nparts_left))
+        stack.append(
+            (ids[order[nleft:]], first + nparts_left, nparts_ids - nparts_left)
+        )
+    return labels
+
+
+def partition_files(filenames):
+    """
+    Files of a partitioned mesh
+
+    Args:
+        filenames (str or list): List of files, one per partition, glob pattern
+                                 such as ``out_*.vtu``, or ``.pvtu`` file listing
+                                 its pieces
+
+    Returns:
+        list: Files of the partitions
+    """
+    if not isinstance(filenames, str):
+        return list(filenames)
+    if filenames.endswith(".pvtu"):
+        import os
+        import xml.etree.ElementTree as ET
+
+        directory = os.path.dirname(filenames)
+        return [
+            os.path.join(directory, piece.get("Source"))
+            for piece in ET.parse(filenames).getroot().iter("Piece")
+        ]
+    if any(char in filenames for char in "*?["):
+        import glob
+
+        files = sorted(glob.glob(filenames))
+        if len(files) == 0:
+            raise FileNotFoundError("No file matches {}".format(filenames))
+        return files
+    return [filenames]
+
+
+def merge_meshes(meshes, decimals=None):
+    """
+    Merge the partitions of a mesh, removing the duplicated points of their
+    interfaces and the ghost cells (non-zero ``vtkGhostType`` cell data)
+
+    Points and cell blocks are numbered in the order of the partitions. Point and
+    cell data defined on all partitions are kept, the values of duplicated points
+    being those of their first occurrence.
+
+    Args:
+        meshes (list): Partitions (meshio meshes)
+        decimals (int): Number of decimals to which coordinates are rounded before
+                        comparison, by default duplicated points must be equal
+
+    Returns:
+        meshio mesh: Merged mesh
+    """
+    points = np.concatenate([_points(mesh) for mesh in meshes])
+    keys = points if decimals is None else np.round(points, decimals)
+
+    # Duplicated points are contiguous once sorted lexicographically, the stable
+    # sort keeping their first occurrence first
+    order = np.lexsort(keys.T[::-1])
+    keys = keys[order]
+    new = np.ones(len(keys), dtype=bool)
+    new[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+    inverse = np.empty(len(keys), dtype=int)
+    inverse[order] = np.cumsum(new) - 1
+    first = order[new]
+
+    # Unique points numbered by first occurrence
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    first = first[order]
+    renumbering = rank[inverse]
+
+    point_names = set.intersection(*[set(mesh.point_data) for mesh in meshes])
+    cell_names = set.intersection(*[set(mesh.cell_data) for mesh in meshes])
+    cell_names.discard("vtkGhostType")
+
+    blocks = {}
+    begin = 0
+    for mesh in meshes:
+        for k, cells in enumerate(mesh.cells):
+            kept = slice(None)
+            if "vtkGhostType" in mesh.cell_data:
+                kept = np.asarray(mesh.cell_data["vtkGhostType"][k]).ravel() == 0
+            block = blocks.setdefault(
+                cells.type, ([], {name: [] for name in cell_names})
+            )
+            block[0].append(renumbering[begin + cells.data[kept]])
+            for name in cell_names:
+                block[1][name].append(np.asarray(mesh.cell_data[name][k])[kept])
+        begin += len(mesh.points)
+
+    point_data = {
+        name: np.concatenate([mesh.point_data[name] for mesh in meshes])[first]
+        for name in point_names
+    }
+    cell_data = {
+        name: [np.concatenate(block[1][name]) for block in blocks.values()]
+        for name in cell_names
+    }
+    cells = [(celltype, np.concatenate(block[0])) for celltype, block in blocks.items()]
+    return meshio.Mesh(points[first], cells, point_data=point_data, cell_data=cell_data)
+
+
+def read_partitioned(filenames, workers=1, decimals=None):
+    """
+    Read a partitioned mesh, e.g. one file per rank of a parallel solver, and merge
+    its partitions, see :py:func:`merge_meshes`
+
+    Args:
+        filenames (str or list): Files of the partitions,
+                                 see :py:func:`partition_files`
+        workers (int): Number of processes reading the partitions
+        decimals (int): Number of decimals to which coordinates are rounded
+                        before removing duplicated points
+
+    Returns:
+        meshio mesh: Merged mesh
+    """
+    files = partition_files(filenames)
+    if len(files) == 1:
+        return meshio.read(files[0])
+
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            meshes = list(executor.map(meshio.read, files))
+    else:
+        meshes = [meshio.read(filename) for filename in files]
+    return merge_meshes(meshes, decimals)
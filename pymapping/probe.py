@@ -0,0 +1,96 @@
+import numpy as np
+
+from .locator import CellLocator
+from .main import _cell_array_from_meshio, cleanup_mesh_meshio
+from .partition import block_offsets
+
+
+class Probe:
+    """
+    Evaluation of the fields of a mesh at arbitrary points, such as sensors.
+
+    A spatial index of the mesh is built once, then each query locates all its
+    points at once and interpolates point fields linearly in the containing cells
+    (in the containing simplex of split quadrangles, pyramids and hexahedra),
+    and takes the value of the containing cell for cell fields.
+
+    Args:
+        mesh (meshio mesh): Mesh made of lines in 1D, triangles or quadrangles
+                            in 2D, or tetrahedra, pyramids or hexahedra in 3D,
+                            holding the fields
+        eps (float): Tolerance on barycentric coordinates for points
+                     on the boundary of cells
+    """
+
+    def __init__(self, mesh, eps=1e-12):
+        cleanup_mesh_meshio(mesh)
+        self.mesh = mesh
+        self.locator = CellLocator(mesh, eps)
+        self.cell_offsets = block_offsets(mesh)
+
+    def locate(self, points):
+        """
+        Locate points in the mesh
+
+        Returns:
+            tuple: Containing cell of each point (``-1`` if outside the mesh)
+                   and barycentric coordinates in the simplex of this cell
+                   containing the point, see :py:class:`~.locator.CellLocator`
+        """
+        return self.locator.locate(points)
+
+    def probe(self, points, fields, default_value=np.nan):
+        """
+        Evaluate fields at points
+
+        Args:
+            points (numpy array): Coordinates of the points, of shape ``(npoints, dim)``
+            fields (list or dict): Names of point or cell fields defined in the mesh,
+                                   or ``dict`` mapping names to arrays. Point arrays
+                                   have one row per mesh point, cell arrays are given
+                                   as in ``mesh.cell_data``. Trailing dimensions
+                                   (components, time steps...) are kept.
+            default_value (float or dict): Value of the points outside the mesh,
+                                           possibly per field
+
+        Returns:
+            dict: Arrays of the fields at the points, one row per point
+        """
+        simplex_ids, weights = self.locator.locate_simplices(points)
+        found = simplex_ids >= 0
+        vertices = self.locator.simplices[simplex_ids[found]]
+        cell_ids = self.locator.simplex_cells[simplex_ids[found]]
+        weights = weights[found]
+
+        if not isinstance(fields, dict):
+            fields = {name: None for name in fields}
+        values = {}
+        for name, array in fields.items():
+            if array is None:
+                if name in self.mesh.point_data:
+                    array = self.mesh.point_data[name]
+                else:
+                    assert name in self.mesh.cell_data
+                    array = self.mesh.cell_data[name]
+
+            if isinstance(array, list):
+                # Cell field: value of the containing cell
+                array = np.asarray(
+                    _cell_array_from_meshio(self.mesh, array, self.cell_offsets)
+                )
+                values_found = array[cell_ids]
+            else:
+                # Point field: linear interpolation of the vertex values
+                array = np.asarray(array)
+                values_found = np.einsum("nv,nv...->n...", weights, array[vertices])
+
+            dft = default_value
+            if isinstance(default_value, dict):
+                dft = default_value[name]
+            values[name] = np.full(
+                (len(simplex_ids),) + values_found.shape[1:],
+                dft,
+                dtype=np.result_type(values_found, dft),
+            )
+            values[name][found] = values_found
+        return values
@@ -0,0 +1,106 @@
+import meshio
+import numpy as np
+
+from .main import Mapper, _cell_data_from_array
+
+
+def transfer_time_series(
+    source_file,
+    mesh_target,
+    field_names=None,
+    method="P1P0",
+    intersection_type=None,
+    nature="IntensiveMaximum",
+    default_value=np.nan,
+    mapper=None,
+):
+    """
+    Transfer the fields of a time series from the source mesh to the target mesh,
+    step after step.
+
+    The mapping is prepared once on the mesh of the time series, then each time
+    step is read, mapped and handed out before the next one is read, so that
+    only one time step is held in memory at a time.
+
+    Args:
+        source_file (str): XDMF time series defined on the source mesh
+        mesh_target (meshio mesh): Target mesh
+        field_names (list): Names of the fields to transfer, all point fields
+                            (``P1*`` methods) or cell fields (``P0*`` methods) if ``None``
+        method (str): Mapping methods: ``P1P0``, ``P1P1``, ``P0P0`` or ``P0P1``
+        intersection_type (str): Intersection algorithm depending on meshes and the method
+        nature (str or dict): Physical nature of the fields, possibly per field
+        default_value (float or dict): Default value when mapping is not possible,
+                                       possibly per field
+        mapper (Mapper): Mapper to prepare, a new one is created if ``None``
+
+    Yields:
+        tuple: Time value and :py:class:`~.MappingResults` of the time step
+    """
+    if mapper is None:
+        mapper = Mapper(verbose=False)
+
+    with meshio.xdmf.TimeSeriesReader(source_file) as reader:
+        points, cells = reader.read_points_cells()
+        mesh_source = meshio.Mesh(points, cells)
+        mapper.prepare(mesh_source, mesh_target, method, intersection_type)
+
+        for k in range(reader.num_steps):
+            t, point_data, cell_data = reader.read_data(k)
+            if method[:2] == "P1":
+                data = point_data
+            else:
+                data = {
+                    name: _cell_values(cells, values, mesh_source)
+                    for name, values in cell_data.items()
+                }
+            if field_names is not None:
+                data = {name: data[name] for name in field_names}
+            yield t, mapper.transfer_many(data, nature, default_value)
+
+
+def map_time_series(source_file, mesh_target, outfile, **kwargs):
+    """
+    Transfer a time series from the source mesh to the target mesh and
+    write it as an XDMF time series, step after step.
+
+    Args:
+        source_file (str): XDMF time series defined on the source mesh
+        mesh_target (meshio mesh): Target mesh
+        outfile (str): XDMF file to store the mapped time series
+        kwargs: Options of :py:func:`~.transfer_time_series`
+    """
+    results = transfer_time_series(source_file, mesh_target, **kwargs)
+    with meshio.xdmf.TimeSeriesWriter(outfile) as writer:
+        for k, (t, res) in enumerate(results):
+            if k == 0:
+                # The target mesh is cleaned up during the preparation
+                writer.write_points_cells(res.mesh_target.points, res.mesh_target.cells)
+            if res.on == "points":
+                writer.write_data(t, point_data={name: res[name] for name in res})
+            else:
+                cell_data = {
+                    name: _cell_data_from_array(
+                        res[name], res.mesh_target, res.cell_offsets
+                    )
+                    for name in res
+                }
+                writer.write_data(t, cell_data=cell_data)
+
+
+def _cell_values(cells, values, mesh):
+    """
+    Gather cell data given on the original cell blocks into a list
+    following the cell blocks of the cleaned-up ``meshio`` mesh
+    """
+    values_dict = {}
+    for cells_block, values_block in zip(cells, values):
+        values_dict.setdefault(cells_block.type, []).append(values_block)
+    values_mesh = []
+    for cells_block in mesh.cells:
+        values_celltype = values_dict[cells_block.type]
+        if len(values_celltype) > 1:
+            values_mesh.append(np.concatenate(values_celltype))
+        else:
+            values_mesh.append(values_celltype[0])
+    return values_mesh
@@ -0,0 +1,367 @@
+import asyncio
+import json
+import socket
+import struct
+from collections import OrderedDict
+
+import numpy as np
+
+from .main import Mapper, _cell_data_from_array
+
+# Each message is made of a prefix holding the sizes of a JSON header and of a
+# binary payload, then the header, then the payload: the raw bytes of the
+# arrays described in the header, one after the other
+_prefix = struct.Struct("!IQ")
+
+
+def pack_message(header, arrays=None):
+    """
+    Frame a message made of a JSON header and named ``numpy`` arrays
+
+    Returns:
+        bytes: Message
+    """
+    header = dict(header)
+    header["arrays"] = []
+    buffers = []
+    for name, array in (arrays or {}).items():
+        array = np.ascontiguousarray(array)
+        header["arrays"].append(
+            {"name": name, "dtype": array.dtype.str, "shape": array.shape}
+        )
+        buffers.append(array.data.cast("B"))
+    header = json.dumps(header).encode()
+    payload_size = sum(len(buffer) for buffer in buffers)
+    return b"".join([_prefix.pack(len(header), payload_size), header] + buffers)
+
+
+def unpack_message(header, payload):
+    """
+    Header and arrays of a message whose prefix was already read
+
+    Returns:
+        tuple: Header (``dict``) and arrays (``dict`` of ``numpy`` arrays)
+    """
+    header = json.loads(header)
+    arrays = {}
+    offset = 0
+    for spec in header.pop("arrays"):
+        dtype = np.dtype(spec["dtype"])
+        size = int(np.prod(spec["shape"], dtype=int)) * dtype.itemsize
+        arrays[spec["name"]] = np.frombuffer(
+            payload, dtype=dtype, count=size // dtype.itemsize, offset=offset
+        ).reshape(spec["shape"])
+        offset += size
+    return header, arrays
+
+
+async def _read_message(reader):
+    prefix = await reader.readexactly(_prefix.size)
+    header_size, payload_size = _prefix.unpack(prefix)
+    header = await reader.readexactly(header_size)
+    payload = await reader.readexactly(payload_size)
+    return unpack_message(header, payload)
+
+
+def _prepare_matrix(mesh_source_file, mesh_target_file, method, intersection_type):
+    """
+    Read and prepare a mesh pair in a worker process
+
+    Returns:
+        tuple: Cleaned-up source and target meshes, and the interpolation matrix
+    """
+    import meshio
+
+    mapper = Mapper(verbose=False)
+    mesh_source = meshio.read(mesh_source_file)
+    mesh_target = meshio.read(mesh_target_file)
+    mapper.prepare(mesh_source, mesh_target, method, intersection_type)
+    return mesh_source, mesh_target, mapper._crude_matrix()
+
+
+class MappingService:
+    """
+    Local mapping service keeping prepared mappers in memory.
+
+    Mesh pairs are given by their file names. Prepared :py:class:`~.Mapper`
+    objects are kept in a least recently used cache keyed by the mesh pair, the
+    method and the intersection type. Cold pairs are prepared in a process pool,
+    while transfers on hot pairs keep being served.
+
+    Args:
+        max_mappers (int): Maximum number of prepared mappers kept in memory
+        workers (int): Number of processes preparing mesh pairs
+    """
+
+    def __init__(self, max_mappers=8, workers=1):
+        self.max_mappers = max_mappers
+        self.workers = workers
+        self.mappers = OrderedDict()
+        self._pending = {}
+        self._executor = None
+        self._server = None
+        self._serving = None
+
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        """
+        Start listening on a Unix socket if ``path`` is given,
+        otherwise on a TCP port (``0`` for any free port)
+
+        Returns:
+            str or tuple: Address of the service
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        """
+        Serve requests until a ``shutdown`` request is received
+        """
+        self._serving = asyncio.ensure_future(self._server.serve_forever())
+        try:
+            await self._serving
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._server.close()
+            self._executor.shutdown()
+
+    async def mapper(self, mesh_source, mesh_target, method, intersection_type=None):
+        """
+        Prepared mapper of a mesh pair, from the cache or prepared in the process pool
+        """
+        key = (mesh_source, mesh_target, method, intersection_type)
+        if key in self.mappers:
+            self.mappers.move_to_end(key)
+            return self.mappers[key]
+
+        # Concurrent requests on the same cold pair wait for a single preparation
+        if key not in self._pending:
+            self._pending[key] = asyncio.ensure_future(self._prepare(key))
+        try:
+            mapper = await asyncio.shield(self._pending[key])
+        finally:
+            self._pending.pop(key, None)
+        return mapper
+
+    async def _prepare(self, key):
+        loop = asyncio.get_running_loop()
+        mesh_source, mesh_target, matrix = await loop.run_in_executor(
+            self._executor, _prepare_matrix, *key
+        )
+        mapper = Mapper(verbose=False)
+        mapper.prepare(mesh_source, mesh_target, key[2], key[3], matrix=matrix)
+        self.mappers[key] = mapper
+        while len(self.mappers) > self.max_mappers:
+            self.mappers.popitem(last=False)
+        return mapper
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    header, arrays = await _read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                try:
+                    response = await self._dispatch(header, arrays)
+                except Exception as e:
+                    response = (
+                        {
+                            "status": "error",
+                            "error": "{}: {}".format(type(e).__name__, e),
+                        },
+                        None,
+                    )
+                writer.write(pack_message(*response))
+                await writer.drain()
+                if header.get("op") == "shutdown":
+                    self._serving.cancel()
+                    break
+        finally:
+            writer.close()
+
+    async def _dispatch(self, header, arrays):
+        op = header.get("op")
+        if op == "ping":
+            return {"status": "ok"}, None
+        if op == "shutdown":
+            return {"status": "ok"}, None
+        if op == "status":
+            pairs = [list(key) for key in self.mappers]
+            return {"status": "ok", "mappers": pairs}, None
+
+        mapper = await self.mapper(
+            header["mesh_source"],
+            header["mesh_target"],
+            header.get("method", "P1P1"),
+            header.get("intersection_type"),
+        )
+        if op == "prepare":
+            return {"status": "ok"}, None
+        if op == "transfer":
+            if mapper.method[:2] == "P0":
+                arrays = {
+                    name: _cell_data_from_array(
+                        array, mapper.mesh_source, mapper._cell_offsets("source")
+                    )
+                    for name, array in arrays.items()
+                }
+            loop = asyncio.get_running_loop()
+            res = await loop.run_in_executor(
+                None,
+                mapper.transfer_many,
+                arrays,
+                header.get("nature", "IntensiveMaximum"),
+                header.get("default_value", np.nan),
+            )
+            return {"status": "ok"}, {name: res[name] for name in res}
+        raise ValueError("Unknown operation {}".format(op))
+
+
+def serve(path=None, host="127.0.0.1", port=8642, max_mappers=8, workers=1):
+    """
+    Run a :py:class:`~.MappingService` until it receives a ``shutdown`` request
+
+    Args:
+        path (str): Unix socket on which to listen, otherwise a TCP port is used
+        host (str): Host of the TCP port
+        port (int): TCP port
+        max_mappers (int): Maximum number of prepared mappers kept in memory
+        workers (int): Number of processes preparing mesh pairs
+    """
+
+    async def run():
+        service = MappingService(max_mappers=max_mappers, workers=workers)
+        await service.start(path, host, port)
+        await service.serve_forever()
+
+    asyncio.run(run())
+
+
+class MappingClient:
+    """
+    Client of a :py:class:`~.MappingService`
+
+    Args:
+        path (str): Unix socket of the service, otherwise a TCP port is used
+        host (str): Host of the TCP port
+        port (int): TCP port
+    """
+
+    def __init__(self, path=None, host="127.0.0.1", port=8642):
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection((host, port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.socket.close()
+
+    def request(self, header, arrays=None):
+        """
+        Send a request and wait for its response
+
+        Returns:
+            tuple: Header and arrays of the response
+        """
+        self.socket.sendall(pack_message(header, arrays))
+        header_size, payload_size = _prefix.unpack(self._recv(_prefix.size))
+        header = self._recv(header_size)
+        payload = self._recv(payload_size)
+        header, arrays = unpack_message(header, payload)
+        if header["status"] != "ok":
+            raise RuntimeError(header["error"])
+        return header, arrays
+
+    def _recv(self, size):
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        while len(view) > 0:
+            nbytes = self.socket.recv_into(view)
+            if nbytes == 0:
+                raise ConnectionError("Connection closed by the mapping service")
+            view = view[nbytes:]
+        return buffer
+
+    def prepare(self, mesh_source, mesh_target, method="P1P1", intersection_type=None):
+        """
+        Have the service prepare a mesh pair ahead of transfers
+
+        Args:
+            mesh_source (str): Source mesh file, as read by the service
+            mesh_target (str): Target mesh file, as read by the service
+            method (str): Mapping methods: ``P1P0``, ``P1P1``, ``P0P0`` or ``P0P1``
+            intersection_type (str): Intersection algorithm depending on meshes and the method
+        """
+        self.request(
+            {
+                "op": "prepare",
+                "mesh_source": mesh_source,
+                "mesh_target": mesh_target,
+                "method": method,
+                "intersection_type": intersection_type,
+            }
+        )
+
+    def transfer(
+        self,
+        mesh_source,
+        mesh_target,
+        fields,
+        method="P1P1",
+        intersection_type=None,
+        nature="IntensiveMaximum",
+        default_value=np.nan,
+    ):
+        """
+        Map fields given as arrays, see :py:meth:`~.Mapper.transfer_many`
+
+        Args:
+            mesh_source (str): Source mesh file, as read by the service
+            mesh_target (str): Target mesh file, as read by the service
+            fields (dict): Source arrays by field name, with one row per source point
+                           (``P1*`` methods) or cell (``P0*`` methods), cells being
+                           ordered as in the medcoupling mesh
+            method (str): Mapping methods: ``P1P0``, ``P1P1``, ``P0P0`` or ``P0P1``
+            intersection_type (str): Intersection algorithm depending on meshes and the method
+            nature (str or dict): Physical nature of the fields, possibly per field
+            default_value (float or dict): Default value when mapping is not possible,
+                                           possibly per field
+
+        Returns:
+            dict: Mapped arrays by field name
+        """
+        _, arrays = self.request(
+            {
+                "op": "transfer",
+                "mesh_source": mesh_source,
+                "mesh_target": mesh_target,
+                "method": method,
+                "intersection_type": intersection_type,
+                "nature": nature,
+                "default_value": default_value,
+            },
+            fields,
+        )
+        return arrays
+
+    def shutdown(self):
+        """
+        Stop the service
+        """
+        self.request({"op": "shutdown"})
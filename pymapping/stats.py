@@ -0,0 +1,206 @@
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Peak resident set sizes reached so far by the open stages of all mappers,
+# sampled by a background thread while at least one stage is open
+_open_stages = []
+_open_stages_lock = threading.Lock()
+_sampler = None
+_sample_interval = 0.01
+
+
+def peak_rss():
+    """
+    Peak resident set size of the current process
+
+    Returns:
+        int: Peak resident set size in bytes, ``None`` if not available on the platform
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        return rss
+    return rss * 1024
+
+
+def _current_rss():
+    """
+    Resident set size of the current process in bytes, ``None`` if not available
+    on the platform (only on Linux)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    import resource
+
+    return pages * resource.getpagesize()
+
+
+def _sample_rss():
+    """
+    Update the peaks of the open stages until all of them are closed
+    """
+    global _sampler
+    while True:
+        time.sleep(_sample_interval)
+        rss = _current_rss()
+        with _open_stages_lock:
+            if len(_open_stages) == 0:
+                _sampler = None
+                return
+            for peak in _open_stages:
+                peak[0] = max(peak[0], rss)
+
+
+class StageRecord:
+    """
+    Measurements of one stage of a :py:class:`~.Mapper`
+
+    Args:
+        name (str): Name of the stage, e.g. ``prepare`` or ``transferField``
+        wall_time (float): Elapsed time in seconds
+        cpu_time (float): CPU time of the process in seconds
+        peak_rss (int): Peak resident set size of the process in bytes during
+                        the stage, sampled every 10 ms (on Linux; peak since the
+                        start of the process on other platforms)
+        counts (dict): Sizes handled by the stage (points, cells, non-zeros...)
+    """
+
+    def __init__(self, name, wall_time, cpu_time, peak_rss, counts):
+        self.name = name
+        self.wall_time = wall_time
+        self.cpu_time = cpu_time
+        self.peak_rss = peak_rss
+        self.counts = counts
+
+    def __repr__(self):
+        return "StageRecord({!r}, wall_time={:.3g}, cpu_time={:.3g})".format(
+            self.name, self.wall_time, self.cpu_time
+        )
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+            "counts": self.counts,
+        }
+
+
+class MapperStats:
+    """
+    Timing and memory measurements of the stages run by a :py:class:`~.Mapper`.
+
+    Stages may be nested (e.g. a mesh conversion during ``prepare``), in which
+    case the measurements of the outer stage include the inner ones.
+
+    Args:
+        hooks (list): Callables invoked with the :py:class:`~.StageRecord`
+                      of each completed stage
+    """
+
+    def __init__(self, hooks=None):
+        self.records = []
+        self.hooks = [] if hooks is None else list(hooks)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    @contextmanager
+    def stage(self, name, **counts):
+        """
+        Context manager measuring a stage. It yields the ``counts`` dictionary
+        of the stage, to which sizes only known at the end may be added.
+        """
+        global _sampler
+        counts = dict(counts)
+        rss = _current_rss()
+        if rss is not None:
+            peak = [rss]
+            with _open_stages_lock:
+                _open_stages.append(peak)
+                # Not alive in processes forked while it was running
+                if _sampler is None or not _sampler.is_alive():
+                    _sampler = threading.Thread(target=_sample_rss, daemon=True)
+                    _sampler.start()
+        wall_time = time.perf_counter()
+        cpu_time = time.process_time()
+        try:
+            yield counts
+        finally:
+            if rss is not None:
+                with _open_stages_lock:
+                    del _open_stages[[p is peak for p in _open_stages].index(True)]
+                peak = max(peak[0], _current_rss())
+            else:
+                peak = peak_rss()
+        record = StageRecord(
+            name,
+            time.perf_counter() - wall_time,
+            time.process_time() - cpu_time,
+            peak,
+            counts,
+        )
+        self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def totals(self):
+        """
+        Number of calls and cumulated times of each stage
+
+        Returns:
+            dict: ``calls``, ``wall_time`` and ``cpu_time`` by stage name
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(
+                record.name, {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0}
+            )
+            total["calls"] += 1
+            total["wall_time"] += record.wall_time
+            total["cpu_time"] += record.cpu_time
+        return totals
+
+    def as_dict(self):
+        return {
+            "stages": [record.as_dict() for record in self.records],
+            "totals": self.totals(),
+            "peak_rss": peak_rss(),
+        }
+
+    def write_json(self, filename):
+        """
+        Write all measurements to a JSON file
+        """
+        with open(filename, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def clear(self):
+        """
+        Discard all measurements
+        """
+        self.records = []
+
+
+def stage(stats, name, **counts):
+    """
+    :py:meth:`MapperStats.stage` of ``stats``, or a context manager
+    measuring nothing if ``stats`` is ``None``
+    """
+    if stats is None:
+        return nullcontext(counts)
+    return stats.stage(name, **counts)
@@ -16,11 +16,12 @@ setup(
     url="https://github.com/tianyikillua/pymapping",
     author=about["__author__"],
     author_email=about["__email__"],
-    install_requires=["numpy", "meshio", "medcoupling"],
+    install_requires=["numpy", "scipy", "meshio", "medcoupling"],
     description="Mapping finite element data between meshes",
     long_description=open("README.md").read(),
     long_description_content_type="text/markdown",
     license=about["__license__"],
+    python_requires=">=3.7",
     classifiers=[
         about["__license__"],
         about["__status__"],
@@ -1,3 +1,10 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import medcoupling as mc
 import meshio
 import numpy as np
 import pytest
@@ -39,3 +46,810 @@ def test_P1P0():
         mesh_source, mesh_target, method="P1P0", intersection_type="Triangulation"
     )
     mapper.transfer("f(x)")
+
+
+def test_cache(tmp_path, capsys):
+    cache = pymapping.MatrixCache(str(tmp_path))
+    res = []
+    for _ in range(2):
+        mapper_cached = pymapping.Mapper(verbose=True, cache=cache)
+        mapper_cached.prepare(
+            mesh_source, mesh_target, method="P1P1", intersection_type="PointLocator"
+        )
+        res.append(mapper_cached.transfer("f(x)").array())
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+    assert "Loading cached" in capsys.readouterr().out
+    assert np.allclose(res[0], res[1])
+
+    # A cache smaller than any entry keeps nothing
+    cache.max_size = 1
+    mapper_cached.prepare(
+        mesh_source, mesh_target, method="P1P0", intersection_type="Triangulation"
+    )
+    assert len(list(tmp_path.glob("*.npz"))) == 0
+
+    # Files being written by other processes are not entries
+    (tmp_path / "entry.tmp").write_bytes(b"")
+    cache.clear()
+    assert (tmp_path / "entry.tmp").exists()
+
+    # Mappers with different remapper options do not share entries
+    mesh_out = mesh_unit_interval(2)
+    mesh_out.points = np.array([0.5, 1 + 1e-4])
+    cache.max_size = None
+    res = []
+    for tol in [1e-12, 1e-2]:
+        mapper_cached = pymapping.Mapper(verbose=False, cache=cache)
+        mapper_cached._mapper.setPrecision(tol)
+        mapper_cached._mapper.setBoundingBoxAdjustmentAbs(tol)
+        mapper_cached.prepare(mesh_source, mesh_out, "P1P1", "PointLocator")
+        res.append(mapper_cached.transfer("f(x)").array())
+    assert len(list(tmp_path.glob("*.npz"))) == 2
+    assert np.isnan(res[0][1])
+    assert np.isclose(res[1][1], f[-1])
+
+
+def test_transfer_many():
+    mapper.prepare(
+        mesh_source, mesh_target, method="P1P1", intersection_type="PointLocator"
+    )
+    timesteps = np.outer(f, np.arange(4))
+    res = mapper.transfer_many({"f(x)": f, "f(x, t)": timesteps})
+    assert np.allclose(res["f(x)"], mapper.transfer("f(x)").array())
+    assert res["f(x, t)"].shape == (len(mesh_target.points), 4)
+    assert np.allclose(res["f(x, t)"], np.outer(res["f(x)"], np.arange(4)))
+
+
+def test_time_series(tmp_path, monkeypatch):
+    import pymapping.series
+
+    # XDMF only supports 2D or 3D points
+    def embed(mesh):
+        points = np.column_stack([mesh.points, np.zeros_like(mesh.points)])
+        return meshio.Mesh(points, mesh.cells)
+
+    # meshio writes the HDF5 data relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    with meshio.xdmf.TimeSeriesWriter("source.xdmf") as writer:
+        writer.write_points_cells(embed(mesh_source).points, mesh_source.cells)
+        for t in range(3):
+            writer.write_data(t, point_data={"f(x)": t * f})
+
+    mesh_target_series = embed(mesh_target)
+    results = pymapping.series.transfer_time_series(
+        "source.xdmf",
+        mesh_target_series,
+        method="P1P1",
+        intersection_type="PointLocator",
+    )
+    y_target = np.interp(mesh_target.points, mesh_source.points, f)
+    for t, res in results:
+        assert np.allclose(res["f(x)"], t * y_target)
+
+    meshio.write("target.xdmf", mesh_target_series)
+    pymapping.cli.main(
+        ["series", "source.xdmf", "target.xdmf", "target_series.xdmf"]
+        + ["--method", "P1P1", "--intersection_type", "PointLocator"]
+        + ["--profile", "profile.json"]
+    )
+    with meshio.xdmf.TimeSeriesReader("target_series.xdmf") as reader:
+        reader.read_points_cells()
+        assert reader.num_steps == 3
+    with open("profile.json") as profile:
+        assert json.load(profile)["totals"]["transfer_many"]["calls"] == 3
+
+
+def test_mesh_mc_blocks():
+    cells_line = mesh_source.cells_dict["line"]
+    cells = [("line", block) for block in np.array_split(cells_line, 7)]
+    cells.insert(3, ("vertex", np.arange(5)[:, None]))
+    mesh = meshio.Mesh(mesh_source.points, cells)
+    mesh_mc = pymapping.mesh_mc_from_meshio(mesh)
+
+    assert mesh_mc.getNumberOfCells() == len(cells_line) + 5
+    assert mesh_mc.getAllGeoTypesSorted() == [mc.NORM_SEG2, mc.NORM_POINT1]
+    conn = mesh_mc.getNodalConnectivity().toNumPyArray()
+    conn_line = conn[: 3 * len(cells_line)].reshape(-1, 3)
+    assert np.all(conn_line[:, 1:] == cells_line)
+
+
+def test_mesh_meshio_shared():
+    mapper.prepare(
+        mesh_source, mesh_target, method="P1P1", intersection_type="PointLocator"
+    )
+    res = mapper.transfer("f(x)")
+    mesh = res.mesh_meshio(copy=False)
+    assert np.shares_memory(mesh.points, mesh_target.points)
+    assert not mesh.points.flags.writeable
+    assert "f(x)" not in mesh_target.point_data
+
+    res_many = mapper.transfer_many({"g(x)": 2 * f})
+    assert res_many.mesh_meshio(mesh=mesh) is mesh
+    assert np.allclose(mesh.point_data["g(x)"], 2 * mesh.point_data["f(x)"])
+
+    # Data, field data and sets of the target mesh are kept, read-only
+    mesh_tagged = mesh_unit_interval(10)
+    mesh_tagged.point_data = {"h": np.zeros(10)}
+    mesh_tagged.field_data = {"left": np.array([1, 0])}
+    mesh_tagged.point_sets = {"ends": np.array([0, 9])}
+    mapper.prepare(mesh_source, mesh_tagged, "P1P1", "PointLocator")
+    mesh = mapper.transfer("f(x)").mesh_meshio(copy=False)
+    assert mesh.field_data is mesh_tagged.field_data
+    assert mesh.point_sets is mesh_tagged.point_sets
+    assert not mesh.point_data["h"].flags.writeable
+    assert "f(x)" not in mesh_tagged.point_data
+
+
+@pytest.mark.parametrize("method", ["P1P1", "P1P0"])
+def test_parallel(method):
+    mapper.prepare(
+        mesh_source, mesh_target, method=method, intersection_type="Triangulation"
+    )
+    mapper_parallel = pymapping.Mapper(verbose=False)
+    mapper_parallel.prepare(
+        mesh_source,
+        mesh_target,
+        method=method,
+        intersection_type="Triangulation",
+        workers=3,
+    )
+    assert np.allclose(
+        mapper_parallel.transfer("f(x)").array(), mapper.transfer("f(x)").array()
+    )
+
+
+@pytest.mark.parametrize("method", ["P1P1", "P1P0"])
+def test_numpy_backend(method):
+    mapper_numpy = pymapping.Mapper(verbose=False, backend="numpy")
+    mapper_numpy.prepare(mesh_source, mesh_target, method=method)
+    res = mapper_numpy.transfer("f(x)")
+
+    x_target = res.discretization_points()
+    y_target_from_source = np.interp(x_target, mesh_source.points, f)
+    assert np.allclose(y_target_from_source, res.array())
+    assert np.allclose(mapper_numpy.transfer_many(["f(x)"])["f(x)"], res.array())
+
+
+def test_numpy_backend_without_medcoupling():
+    # The numpy backend prepares and transfers with medcoupling unavailable
+    code = """
+import sys
+sys.modules["medcoupling"] = None
+import json
+import numpy as np
+import meshio
+import pymapping
+
+def mesh(N):
+    points = np.linspace(0, 1, N)
+    cells = np.column_stack([np.arange(N - 1), np.arange(1, N)])
+    return meshio.Mesh(points, [("line", cells)], point_data={"f": np.sin(points)})
+
+res = {}
+for method in ["P1P1", "P1P0"]:
+    mapper = pymapping.Mapper(verbose=False, backend="numpy")
+    mapper.prepare(mesh(100), mesh(10), method=method)
+    res[method] = mapper.transfer_many(["f"])["f"].tolist()
+print(json.dumps(res))
+"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [
+            os.path.dirname(os.path.dirname(pymapping.__file__)),
+            env.get("PYTHONPATH", ""),
+        ]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env
+    )
+    assert proc.returncode == 0, proc.stderr
+    res = json.loads(proc.stdout)
+
+    x_source = np.linspace(0, 1, 100)
+    x = np.linspace(0, 1, 10)
+    for method, x_target in [("P1P1", x), ("P1P0", (x[:-1] + x[1:]) / 2)]:
+        y_target_from_source = np.interp(x_target, x_source, np.sin(x_source))
+        assert np.allclose(res[method], y_target_from_source)
+
+
+@pytest.mark.parametrize("method", ["P1P1", "P1P0", "P0P0"])
+def test_crop(method):
+    mesh_target_part = mesh_unit_interval(10)
+    mesh_target_part.points = 0.2 + 0.3 * mesh_target_part.points
+    mesh_source_cells = meshio.Mesh(
+        mesh_source.points,
+        mesh_source.cells,
+        point_data=mesh_source.point_data,
+        cell_data={"f": [np.arange(len(mesh_source.cells[0].data), dtype=float)]},
+    )
+
+    field_name = "f" if method[:2] == "P0" else "f(x)"
+    results = []
+    for crop in [True, False]:
+        mapper.prepare(
+            mesh_source_cells,
+            mesh_target_part,
+            method=method,
+            intersection_type="Triangulation",
+            crop=crop,
+        )
+        results.append(mapper.transfer(field_name).array())
+    assert np.allclose(results[0], results[1])
+
+
+def test_stats():
+    records = []
+    mapper_stats = pymapping.Mapper(verbose=False, hooks=[records.append])
+    mapper_stats.prepare(
+        mesh_source, mesh_target, method="P1P1", intersection_type="Triangulation"
+    )
+    res = mapper_stats.transfer("f(x)")
+    res.mesh_meshio(copy=False)
+
+    stages = [record.name for record in mapper_stats.stats]
+    assert records == mapper_stats.stats.records
+    assert stages.count("cleanup_mesh_meshio") == 2
+    for name in ["mesh_mc_from_meshio", "prepare", "field_mc_from_meshio"]:
+        assert name in stages
+    assert stages[-2:] == ["transferField", "export"]
+    for record in records:
+        assert record.wall_time >= 0 and record.cpu_time >= 0
+    assert mapper_stats.stats.totals()["cleanup_mesh_meshio"]["calls"] == 2
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="per-stage peak memory on Linux only"
+)
+def test_stats_peak_rss():
+    stats = pymapping.MapperStats()
+    with stats.stage("outer"):
+        with stats.stage("large"):
+            array = np.ones(2**24)
+            time.sleep(0.05)
+            del array
+        with stats.stage("small"):
+            pass
+    large, small, outer = (record.peak_rss for record in stats)
+    assert large - small > 2**26
+    assert outer >= large
+
+    # The peak of the process is not reset by stages
+    assert pymapping.stats.peak_rss() > 2**27
+
+
+def test_batch(tmp_path):
+    mesh_source_2d = meshio.Mesh(
+        np.column_stack([mesh_source.points, np.zeros_like(mesh_source.points)]),
+        mesh_source.cells,
+        point_data={"f(x)": f, "g(x)": 2 * f},
+    )
+    meshio.write(tmp_path / "source.xdmf", mesh_source_2d)
+    for n in [10, 20]:
+        mesh = mesh_unit_interval(n)
+        mesh.points = np.column_stack([mesh.points, np.zeros_like(mesh.points)])
+        meshio.write(tmp_path / "target_{}.xdmf".format(n), mesh)
+
+    jobs = [
+        {"field_name": "f(x)", "outfile": "f_10.npy"},
+        {"field_name": ["f(x)", "g(x)"], "outfile": "fg_10.npy"},
+        {"field_name": "f(x)", "outfile": "f_20.npy", "mesh_target": "target_20.xdmf"},
+        {"field_name": "h(x)", "outfile": "h_10.npy"},
+    ]
+    for job in jobs:
+        job.setdefault("mesh_source", "source.xdmf")
+        job.setdefault("mesh_target", "target_10.xdmf")
+        job["intersection_type"] = "PointLocator"
+    with open(tmp_path / "manifest.json", "w") as manifest:
+        json.dump(jobs, manifest)
+
+    status = pymapping.cli.main(
+        ["batch", str(tmp_path / "manifest.json"), "--workers", "2"]
+        + ["--log", str(tmp_path / "log.jsonl")]
+    )
+    assert status == 1
+    with open(tmp_path / "log.jsonl") as log:
+        records = [json.loads(line) for line in log]
+    assert sorted(record["status"] for record in records) == ["error", "ok", "ok", "ok"]
+
+    for n in [10, 20]:
+        x = np.linspace(0, 1, n)
+        y = np.load(tmp_path / "f_{}.npy".format(n))
+        assert np.allclose(y, np.interp(x, mesh_source.points, f))
+    fg = np.load(tmp_path / "fg_10.npy")
+    assert np.allclose(fg, np.outer(np.load(tmp_path / "f_10.npy"), [1, 2]))
+
+
+def test_service(tmp_path):
+    import os
+    import threading
+    import time
+
+    from pymapping.service import MappingClient
+
+    mesh_source_2d = meshio.Mesh(
+        np.column_stack([mesh_source.points, np.zeros_like(mesh_source.points)]),
+        mesh_source.cells,
+    )
+    mesh_target_2d = meshio.Mesh(
+        np.column_stack([mesh_target.points, np.zeros_like(mesh_target.points)]),
+        mesh_target.cells,
+    )
+    source = str(tmp_path / "source.xdmf")
+    target = str(tmp_path / "target.xdmf")
+    meshio.write(source, mesh_source_2d)
+    meshio.write(target, mesh_target_2d)
+
+    path = str(tmp_path / "service.sock")
+    thread = threading.Thread(
+        target=pymapping.cli.main, args=(["serve", "--socket", path],), daemon=True
+    )
+    thread.start()
+    while not os.path.exists(path):
+        time.sleep(0.01)
+
+    with MappingClient(path) as client:
+        res = client.transfer(
+            source,
+            target,
+            {"f(x)": f, "f(x, t)": np.outer(f, np.arange(3))},
+            intersection_type="PointLocator",
+        )
+        y_target = np.interp(mesh_target.points, mesh_source.points, f)
+        assert np.allclose(res["f(x)"], y_target)
+        assert np.allclose(res["f(x, t)"], np.outer(y_target, np.arange(3)))
+
+        cells = np.arange(len(mesh_source.cells[0].data), dtype=float)
+        res = client.transfer(
+            source, target, {"c": cells}, method="P0P0", nature="IntensiveConservation"
+        )
+        assert res["c"].shape == (len(mesh_target.cells[0].data),)
+
+        with pytest.raises(RuntimeError):
+            client.transfer(source, str(tmp_path / "missing.xdmf"), {"f(x)": f})
+        client.shutdown()
+    thread.join()
+
+
+def test_probe():
+    mesh = meshio.Mesh(
+        mesh_source.points,
+        mesh_source.cells,
+        point_data={"f(x)": f},
+        cell_data={"c": [np.arange(len(mesh_source.cells[0].data), dtype=float)]},
+    )
+    probe = pymapping.Probe(mesh)
+    for npoints in [1, 50]:
+        points = np.random.default_rng(npoints).uniform(-0.1, 1.1, npoints)
+        values = probe.probe(points, ["f(x)", "c"], default_value={"f(x)": 0, "c": -1})
+
+        inside = (points >= 0) & (points <= 1)
+        y = np.interp(points, mesh_source.points, f)
+        assert np.allclose(values["f(x)"], np.where(inside, y, 0))
+        cells = np.minimum(np.floor(points * 99), 98)
+        assert np.allclose(values["c"], np.where(inside, cells, -1))
+
+    values = probe.probe([0.5, 2], {"f(x, t)": np.outer(f, np.arange(3))})
+    assert values["f(x, t)"].shape == (2, 3)
+    assert np.all(np.isnan(values["f(x, t)"][1]))
+
+
+def test_probe_quad():
+    # Grid of 2x2 quadrangles, the last one made of two triangles, and
+    # 2x2x2 hexahedra, with a linear point field and the cell index
+    x = np.linspace(0, 1, 3)
+    points_2d = np.stack(np.meshgrid(x, x, indexing="ij"), -1).reshape(-1, 2)
+    quads = np.array([[0, 3, 4, 1], [1, 4, 5, 2], [3, 6, 7, 4]])
+    triangles = np.array([[4, 7, 8], [4, 8, 5]])
+    mesh_2d = meshio.Mesh(points_2d, [("triangle", triangles), ("quad", quads)])
+
+    points_3d = np.stack(np.meshgrid(x, x, x, indexing="ij"), -1).reshape(-1, 3)
+    corners = np.array([0, 9, 12, 3, 1, 10, 13, 4])
+    origins = np.array([0, 1, 3, 4, 9, 10, 12, 13])
+    hexahedra = origins[:, None] + corners
+    mesh_3d = meshio.Mesh(points_3d, [("hexahedron", hexahedra)])
+
+    rng = np.random.default_rng(0)
+    for mesh in [mesh_2d, mesh_3d]:
+        dim = mesh.points.shape[1]
+        mesh.point_data = {"g": mesh.points @ np.arange(1, dim + 1)}
+        offsets = pymapping.partition.block_offsets(mesh)
+        mesh.cell_data = {"c": [np.arange(*offset, dtype=float) for offset in offsets]}
+        probe = pymapping.Probe(mesh)
+        points = rng.uniform(-0.1, 1.1, (100, dim))
+        values = probe.probe(points, ["g", "c"])
+
+        inside = np.all((points >= 0) & (points <= 1), axis=1)
+        g = points @ np.arange(1, dim + 1)
+        assert np.allclose(values["g"][inside], g[inside])
+        assert np.all(np.isnan(values["g"][~inside]))
+
+        # Cells of the points of the mesh, checked with their bounding boxes
+        cell_ids, _ = probe.locate(points)
+        assert np.all((cell_ids >= 0) == inside)
+        assert np.all(values["c"][inside] == cell_ids[inside])
+        lower, upper = pymapping.partition.cell_bounding_boxes(mesh)
+        cell_ids = cell_ids[inside]
+        assert np.all(points[inside] >= lower[cell_ids] - 1e-12)
+        assert np.all(points[inside] <= upper[cell_ids] + 1e-12)
+
+
+@pytest.mark.parametrize("method", ["P1P1", "P0P0"])
+@pytest.mark.parametrize("update", ["update_target", "update_source"])
+def test_update(method, update):
+    # Mesh of 10 cells moved near x = 0.2 and refined near x = 0.7
+    points = np.linspace(0, 1, 11)
+    points[2] += 0.03
+    points = np.sort(np.concatenate([points, [0.65, 0.75]]))
+    cells_line = np.array([(i, i + 1) for i in range(len(points) - 1)], dtype=int)
+    mesh_new = meshio.Mesh(points, {"line": cells_line[::-1]})
+
+    meshes = [mesh_unit_interval(11), mesh_unit_interval(27)]
+    if update == "update_target":
+        meshes = meshes[::-1]
+    mapper_update = pymapping.Mapper(verbose=False)
+    mapper_update.prepare(*meshes, method=method, intersection_type="Triangulation")
+    getattr(mapper_update, update)(mesh_new)
+    assert mapper_update.stats.records[-1].counts["nrows"] < 27
+
+    mapper_new = pymapping.Mapper(verbose=False)
+    mapper_new.prepare(
+        mapper_update.mesh_source,
+        mapper_update.mesh_target,
+        method=method,
+        intersection_type="Triangulation",
+    )
+    matrix = mapper_update._crude_matrix() - mapper_new._crude_matrix()
+    assert np.allclose(matrix.toarray(), 0)
+
+
+@pytest.mark.parametrize("nature", ["IntensiveConservation", "ExtensiveConservation"])
+def test_transfer_back(nature):
+    mesh_back = mesh_unit_interval(10)
+    mesh_back.points = 0.05 + 0.9 * mesh_back.points
+    mesh_back.cell_data = {"c": [np.linspace(1, 2, len(mesh_back.cells[0].data))]}
+    mapper.prepare(
+        mesh_source, mesh_back, method="P0P0", intersection_type="Triangulation"
+    )
+    res = mapper.transfer_back(["c"], nature)
+
+    mapper_back = pymapping.Mapper(verbose=False)
+    mapper_back.prepare(
+        mesh_back, mesh_source, method="P0P0", intersection_type="Triangulation"
+    )
+    y = mapper_back.transfer("c", nature).array()
+    assert np.allclose(res["c"], y, equal_nan=True)
+    assert np.allclose(
+        mapper.reverse().transfer("c", nature).array(), y, equal_nan=True
+    )
+
+    # The reverse mapper is updated like any prepared mapper
+    mapper.reverse().update_target(mesh_source)
+    assert np.allclose(
+        mapper.reverse().transfer("c", nature).array(), y, equal_nan=True
+    )
+
+
+def test_transfer_back_point_locator():
+    # Transposed interpolation weights are not a reverse mapping
+    mapper.prepare(mesh_source, mesh_target, "P1P1", "PointLocator")
+    with pytest.raises(ValueError):
+        mapper.transfer_back(["f(x)"])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_prepare_many(workers):
+    meshes_target = [mesh_unit_interval(n) for n in [5, 10, 20]]
+    meshes_target[0].points = 0.1 + 0.5 * meshes_target[0].points
+    meshes_target[1].points = 2 + meshes_target[1].points
+    mappers = pymapping.prepare_many(
+        mesh_source,
+        meshes_target,
+        method="P1P1",
+        intersection_type="PointLocator",
+        workers=workers,
+    )
+    for mapper_target, mesh in zip(mappers, meshes_target):
+        assert mapper_target.mesh_source_mc is mappers[0].mesh_source_mc
+        y = np.interp(mesh.points, mesh_source.points, f, left=np.nan, right=np.nan)
+        assert np.allclose(mapper_target.transfer("f(x)").array(), y, equal_nan=True)
+        assert np.allclose(
+            mapper_target.transfer_many(["f(x)"])["f(x)"], y, equal_nan=True
+        )
+
+
+@pytest.mark.parametrize("ext", [".npy", ".h5"])
+def test_field_writer(tmp_path, ext):
+    mapper.prepare(
+        mesh_source, mesh_target, method="P1P1", intersection_type="PointLocator"
+    )
+    timesteps = np.outer(f, np.arange(3))
+    outfile = str(tmp_path / ("res" + ext))
+    with pymapping.FieldWriter(outfile) as writer:
+        for t in range(3):
+            fields = {"f(x)": f, "f(x, t)": timesteps[:, t]}
+            assert writer.write(mapper.transfer_many(fields)) == t
+    # Appending to an existing file, block of rows after block of rows
+    step = mapper.transfer_to(outfile, {"f(x)": f}, chunk_rows=3)
+    assert step == 3
+
+    res = mapper.transfer_many({"f(x, t)": timesteps})["f(x, t)"]
+    values = pymapping.read_field(outfile, "f(x, t)")
+    assert values.shape == (4, len(mesh_target.points))
+    assert np.allclose(values[:3], res.T)
+    assert np.all(np.isnan(values[3]))
+    y = mapper.transfer("f(x)").array()
+    assert np.allclose(pymapping.read_field(outfile, "f(x)", steps=3), y)
+    assert np.allclose(
+        pymapping.read_field(outfile, "f(x)", steps=0, rows=[2, 5]), y[[2, 5]]
+    )
+
+    # Overwriting an existing file
+    with pymapping.FieldWriter(outfile, mode="w") as writer:
+        writer.write({"g": 2 * y})
+        assert writer.fields == ["g"]
+        assert writer.nsteps == 1
+    assert np.allclose(pymapping.read_field(outfile, "g", steps=0), 2 * y)
+
+
+def test_import_time():
+    # Neither importing pymapping nor running the command line interface up to
+    # argument parsing loads the heavy libraries
+    code = "import pymapping; pymapping.cli.main(['--version'])"
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [
+            os.path.dirname(os.path.dirname(pymapping.__file__)),
+            env.get("PYTHONPATH", ""),
+        ]
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert proc.returncode == 0
+    modules = {line.split("|")[-1].strip() for line in proc.stderr.splitlines()}
+    assert "pymapping.cli" in modules
+    for module in ["numpy", "scipy", "meshio", "medcoupling"]:
+        assert module not in modules
+
+    assert set(pymapping.__all__) <= set(dir(pymapping))
+    for name in pymapping.__all__:
+        assert getattr(pymapping, name) is not None
+
+
+def test_block_offsets():
+    from pymapping.main import _cell_array_from_meshio, _cell_data_from_array
+    from pymapping.partition import block_offsets
+
+    lines = mesh_source.cells[0].data
+    mesh = meshio.Mesh(
+        mesh_source.points,
+        [("line", lines[:30]), ("vertex", np.arange(5)[:, None]), ("line", lines[30:])],
+    )
+    offsets = block_offsets(mesh)
+    assert np.array_equal(offsets, [[0, 30], [len(lines), len(lines) + 5], [30, 99]])
+
+    values = [
+        np.arange(len(cells.data)) + 1000 * k for k, cells in enumerate(mesh.cells)
+    ]
+    array = _cell_array_from_meshio(mesh, values, offsets)
+    assert np.array_equal(array, np.concatenate([values[0], values[2], values[1]]))
+    for values_block, values_split in zip(values, _cell_data_from_array(array, mesh)):
+        assert np.array_equal(values_block, values_split)
+
+
+def test_diagnostics(tmp_path):
+    # Half of the target mesh is out of the source mesh
+    mesh_shifted = mesh_unit_interval(11)
+    mesh_shifted.points = 0.5 + mesh_shifted.points
+    mapper.prepare(mesh_source, mesh_shifted, "P0P0", "Triangulation")
+    report = mapper.diagnostics({"c": [np.ones(len(mesh_source.cells[0].data))]})
+    assert report["unmapped"] == 5
+    assert np.isclose(report["unmapped_ratio"], 0.5)
+    assert np.isclose(report["target_coverage"]["total"], 0.5)
+    assert np.isclose(report["source_coverage"]["total"], 0.5)
+    assert np.isclose(report["conservation"]["c"], 0.5)
+    coverage = mapper.coverage()
+    assert np.allclose(coverage[:5], 1) and np.allclose(coverage[5:], 0)
+
+    mapper.prepare(mesh_source, mesh_shifted, "P1P1", "PointLocator")
+    report = mapper.diagnostics(["f(x)"])
+    assert report["unmapped"] == 5
+    assert report["conservation"]["f(x)"] is None
+
+    # Rejected by the command line interface
+    for name, mesh in [("source", mesh_source), ("target", mesh_shifted)]:
+        mesh = meshio.Mesh(
+            np.column_stack([mesh.points, np.zeros_like(mesh.points)]),
+            mesh.cells,
+            point_data=mesh.point_data,
+        )
+        meshio.write(tmp_path / "{}.xdmf".format(name), mesh)
+    args = [str(tmp_path / name) for name in ["source.xdmf", "target.xdmf"]]
+    args += ["f(x)", str(tmp_path / "f.npy"), "--intersection_type", "PointLocator"]
+    args += ["--diagnostics", str(tmp_path / "report.json")]
+    assert pymapping.cli.main(args + ["--max_unmapped", "0.1"]) == 1
+    assert not (tmp_path / "f.npy").exists()
+    with open(tmp_path / "report.json") as report:
+        assert json.load(report)["unmapped"] == 5
+    assert pymapping.cli.main(args + ["--max_unmapped", "0.6"]) is None
+    assert (tmp_path / "f.npy").exists()
+
+
+def test_compact():
+    mapper.prepare(mesh_source, mesh_target, "P1P0", "Triangulation")
+    y = mapper.transfer_many(["f(x)"])["f(x)"]
+    report = mapper.compact(fields={"g": 2 + f})
+    assert report["memory"][1] < report["memory"][0]
+    assert report["integral_error"] < 1e-6
+    assert np.allclose(report["conservation"]["g"], 1, rtol=1e-6)
+    assert mapper._crude_matrix().dtype == np.float32
+    assert mapper._crude_matrix().indices.dtype == np.int32
+
+    # Single precision fields are not upcast
+    res = mapper.transfer_many({"f(x)": f.astype(np.float32)})
+    assert res["f(x)"].dtype == np.float32
+    assert np.allclose(res["f(x)"], y, atol=1e-6)
+    assert np.allclose(mapper.transfer("f(x)").array(), y, atol=1e-6)
+
+
+def test_async():
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    meshes_target = [mesh_unit_interval(n) for n in [5, 10, 20]]
+
+    async def run(executor):
+        mappers = [pymapping.Mapper(verbose=False) for _ in meshes_target]
+        await asyncio.gather(
+            *[
+                mapper_async.prepare_async(
+                    mesh_source, mesh, "P1P1", "PointLocator", executor=executor
+                )
+                for mapper_async, mesh in zip(mappers, meshes_target)
+            ]
+        )
+        return await asyncio.gather(
+            *[mapper_async.transfer_async(["f(x)"]) for mapper_async in mappers]
+        )
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        results = asyncio.run(run(executor))
+    for res, mesh in zip(results, meshes_target):
+        assert np.allclose(res["f(x)"], np.interp(mesh.points, mesh_source.points, f))
+
+    # Concurrent transfers on the same mapper
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        mapper_future = pymapping.Mapper(verbose=False)
+        mapper_future.prepare_future(
+            mesh_source, mesh_target, "P1P0", "Triangulation", executor=executor
+        ).result()
+        y = mapper_future.transfer_many(["f(x)"])["f(x)"]
+        futures = [
+            mapper_future.transfer_future(["f(x)"], executor=executor) for _ in range(8)
+        ]
+        futures += [executor.submit(mapper_future.transfer, "f(x)") for _ in range(8)]
+    for future in futures[:8]:
+        assert np.allclose(future.result()["f(x)"], y)
+    for future in futures[8:]:
+        assert np.allclose(future.result().array(), y)
+
+    # The previous preparation is kept while the new one is computed
+    import threading
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        started = threading.Event()
+        executor.submit(started.wait)
+        try:
+            future = mapper_future.prepare_future(
+                mesh_source, mesh_unit_interval(20), "P1P1", executor=executor
+            )
+            assert np.allclose(mapper_future.transfer("f(x)").array(), y)
+        finally:
+            started.set()
+        assert len(future.result().transfer("f(x)").array()) == 20
+
+    # A preparation finished during a transfer does not change its mapping
+    class Values:
+        def __array__(self, dtype=None, copy=None):
+            mapper_future.prepare(mesh_source, mesh_target, "P1P0", "Triangulation")
+            return f
+
+    y = mapper_future.transfer_many(["f(x)"])["f(x)"]
+    res = mapper_future.transfer_many({"f(x)": Values()})
+    assert np.allclose(res["f(x)"], y)
+    assert len(res.mesh_meshio().points) == 20
+    assert len(mapper_future.transfer("f(x)").array()) == len(mesh_target.points) - 1
+
+
+def test_subdomain():
+    mapper.prepare(mesh_source, mesh_target, "P1P0", "Triangulation")
+    y = mapper.transfer("f(x)").array()
+    centroids = pymapping.partition.cell_centroids(mesh_target)[:, 0]
+
+    # Target cells selected by a predicate or by indices
+    for target_cells in [lambda x: x[:, 0] < 0.5, np.flatnonzero(centroids < 0.5)]:
+        mapper.prepare(
+            mesh_source,
+            mesh_target,
+            "P1P0",
+            "Triangulation",
+            target_cells=target_cells,
+        )
+        res = mapper.transfer("f(x)").array()
+        assert np.allclose(res[centroids < 0.5], y[centroids < 0.5])
+        assert np.all(np.isnan(res[centroids >= 0.5]))
+    with pytest.raises(ValueError):
+        mapper.update_target(mesh_target)
+
+    # Source cells selected by a physical group
+    ncells = len(mesh_source.cells[0].data)
+    x = pymapping.partition.cell_centroids(mesh_source)[:, 0]
+    mesh_source_tagged = meshio.Mesh(
+        mesh_source.points,
+        mesh_source.cells,
+        cell_data={
+            "gmsh:physical": [np.where(x < 0.5, 1, 2)],
+            "g": [np.arange(ncells, dtype=float)],
+        },
+    )
+    mapper.prepare(mesh_source_tagged, mesh_target, "P0P0", "Triangulation")
+    y = mapper.transfer("g").array()
+    mapper.prepare(
+        mesh_source_tagged,
+        mesh_target,
+        "P0P0",
+        "Triangulation",
+        source_cells=("gmsh:physical", [1]),
+    )
+    res = mapper.transfer("g").array()
+    inside = centroids < 0.4
+    assert np.allclose(res[inside], y[inside])
+    assert np.all(np.isnan(res[centroids > 0.6]))
+
+
+def test_read_partitioned(tmp_path):
+    # Partitions sharing their interface points, with a ghost cell
+    points = np.column_stack([mesh_source.points, np.zeros((len(f), 2))])
+    cells = mesh_source.cells[0].data
+    pieces = []
+    for k, (begin, end) in enumerate([(0, 40), (40, 70), (70, len(cells))]):
+        cells_piece = cells[max(begin - 1, 0) : end]
+        point_ids, cells_piece = np.unique(cells_piece, return_inverse=True)
+        ghost = np.zeros(cells_piece.size // 2, dtype=np.uint8)
+        ghost[0] = begin > 0
+        piece = meshio.Mesh(
+            points[point_ids],
+            [("line", cells_piece.reshape(-1, 2))],
+            point_data={"f(x)": f[point_ids]},
+            cell_data={"vtkGhostType": [ghost]},
+        )
+        pieces.append("piece_{}.vtu".format(k))
+        meshio.write(tmp_path / pieces[-1], piece)
+    with open(tmp_path / "mesh.pvtu", "w") as pvtu:
+        pvtu.write("<VTKFile><PUnstructuredGrid>")
+        pvtu.write("".join('<Piece Source="{}"/>'.format(p) for p in pieces))
+        pvtu.write("</PUnstructuredGrid></VTKFile>")
+
+    for filenames, workers in [("mesh.pvtu", 1), ("piece_*.vtu", 2)]:
+        mesh = pymapping.read_partitioned(str(tmp_path / filenames), workers)
+        assert np.allclose(mesh.points, points)
+        assert np.array_equal(mesh.cells[0].data, cells)
+        assert np.allclose(mesh.point_data["f(x)"], f)
+
+
+@pytest.mark.parametrize(
+    "method,intersection_type", [("P1P1", "PointLocator"), ("P1P0", "Triangulation")]
+)
+def test_prepare_hierarchy(method, intersection_type):
+    meshes_target = [mesh_unit_interval(5 * 2**k + 1) for k in range(4)]
+    mappers = pymapping.prepare_hierarchy(
+        mesh_source, meshes_target, method, intersection_type
+    )
+    for mapper_level, mesh in zip(mappers, meshes_target):
+        mapper.prepare(mesh_source, mesh, method, intersection_type)
+        assert np.allclose(
+            mapper_level.transfer("f(x)").array(), mapper.transfer("f(x)").array()
+        )
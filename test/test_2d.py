@@ -67,3 +67,57 @@ def test_cli():
             "Triangulation",
         ]
     )
+
+
+@pytest.mark.parametrize("method", ["P1P1", "P1P0", "P0P1", "P0P0"])
+def test_TUB_transfer_many(method):
+    mapper.prepare(
+        mesh_source, mesh_target, method=method, intersection_type="Triangulation"
+    )
+    res = mapper.transfer_many(["f(x)"])
+    assert np.allclose(res.array("f(x)"), mapper.transfer("f(x)").array())
+
+
+@pytest.mark.parametrize("method", ["P1P1", "P1P0", "P0P1", "P0P0"])
+def test_TUB_parallel(method):
+    mapper.prepare(
+        mesh_source, mesh_target, method=method, intersection_type="Triangulation"
+    )
+    array = mapper.transfer("f(x)").array()
+
+    mapper_parallel = pymapping.Mapper(verbose=False)
+    mapper_parallel.prepare(
+        mesh_source,
+        mesh_target,
+        method=method,
+        intersection_type="Triangulation",
+        workers=3,
+    )
+    res = mapper_parallel.transfer("f(x)")
+    assert np.allclose(res.array(), array)
+
+    integral_source = mapper_parallel.field_source.integral(0, True)
+    integral_target = res.field_target.integral(0, True)
+    assert np.isclose(integral_source, integral_target, rtol=1e-4)
+
+
+@pytest.mark.parametrize("method", ["P1P1", "P1P0"])
+def test_TUB_numpy_backend(method):
+    mesh_source_triangle = mesh_TUB(0.01)
+    mesh_source_triangle.point_data = {
+        "f(x)": 2 * mesh_source_triangle.points[:, 0]
+        + mesh_source_triangle.points[:, 1]
+    }
+    mapper.prepare(
+        mesh_source_triangle,
+        mesh_target,
+        method=method,
+        intersection_type="PointLocator",
+    )
+    mapper_numpy = pymapping.Mapper(verbose=False, backend="numpy")
+    mapper_numpy.prepare(mesh_source_triangle, mesh_target, method=method)
+    assert np.allclose(
+        mapper_numpy.transfer("f(x)").array(),
+        mapper.transfer("f(x)").array(),
+        equal_nan=True,
+    )